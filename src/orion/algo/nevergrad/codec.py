@@ -0,0 +1,426 @@
+"""
+:mod:`orion.algo.nevergrad.codec -- Conversion of Oríon spaces to nevergrad
+===========================================================================
+
+Oríon spaces are converted once into a nevergrad parametrization, and batches of params are
+encoded to and decoded from flat numpy arrays.
+"""
+import logging
+
+import nevergrad as ng
+import numpy
+
+logger = logging.getLogger(__name__)
+
+#: Number of significant digits kept when computing keys of parameters.
+KEY_SIGNIFICANT_DIGITS = 12
+
+#: Margin kept from the bounds of the unit interval when it is mapped to unbounded priors.
+UNIT_MARGIN = 1e-9
+
+converters = {}
+
+
+def converter(dimension_type, prior):
+    """Register the transform mapping dimensions of given type and prior to the unit interval"""
+
+    def deco(transform):
+        converters[dimension_type, prior] = transform
+        return transform
+
+    return deco
+
+
+def _bounds(dim):
+    lower, upper = dim.interval()
+    return float(lower), float(upper)
+
+
+@converter("real", "uniform")
+@converter("integer", "int_uniform")
+class _Linear:
+    """Affine mapping of the bounds of a dimension to the unit interval"""
+
+    def __init__(self, dim):
+        self.lower, upper = _bounds(dim)
+        self.width = upper - self.lower
+
+    def to_unit(self, values):
+        """Map values of the dimension to the unit interval"""
+        if not self.width:
+            return numpy.zeros_like(values)
+        return (values - self.lower) / self.width
+
+    def from_unit(self, unit):
+        """Map points of the unit interval to values of the dimension"""
+        return self.lower + unit * self.width
+
+
+@converter("real", "reciprocal")
+@converter("integer", "int_reciprocal")
+class _Log(_Linear):
+    """Affine mapping of the logarithm of the bounds of a dimension to the unit interval"""
+
+    def __init__(self, dim):
+        super(_Log, self).__init__(dim)
+        lower, upper = _bounds(dim)
+        self.lower = numpy.log(lower)
+        self.width = numpy.log(upper) - self.lower
+
+    def to_unit(self, values):
+        return super(_Log, self).to_unit(numpy.log(values))
+
+    def from_unit(self, unit):
+        return numpy.exp(super(_Log, self).from_unit(unit))
+
+
+@converter("real", "norm")
+@converter("integer", "int_norm")
+class _Prior:
+    """Mapping of a dimension to the unit interval by the cumulative distribution of its prior"""
+
+    def __init__(self, dim):
+        # Oríon keeps the arguments of the scipy distribution apart from it.
+        self.prior = dim.prior(
+            *dim._args, **dim._kwargs  # pylint:disable=protected-access
+        )
+
+    def to_unit(self, values):
+        """Map values of the dimension to the unit interval"""
+        return self.prior.cdf(values)
+
+    def from_unit(self, unit):
+        """Map points of the unit interval to values of the dimension"""
+        return self.prior.ppf(numpy.clip(unit, UNIT_MARGIN, 1 - UNIT_MARGIN))
+
+
+class _ValueConstraint:  # pylint: disable=too-few-public-methods
+    """Constraint on params, evaluated on values of the parametrization of a `SpaceCodec`"""
+
+    def __init__(self, codec, constraint):
+        self.codec = codec
+        self.constraint = constraint
+
+    def __call__(self, value):
+        columns = self.codec.columns(self.codec.from_values([value]))
+        return bool(numpy.all(self.constraint(columns)))
+
+
+class SpaceCodec:
+    """Compiled conversion between an Oríon space and a nevergrad parametrization
+
+    The space is compiled once into a nevergrad parametrization and a table of columns
+    describing how each dimension is laid out in a flat numpy array. Batches of parameters can
+    then be encoded to and decoded from arrays of shape ``(n, size)`` with vectorized operations.
+
+    Categorical dimensions are encoded with the index of their category. The fidelity dimension
+    and the dimension of seeds are not part of the parametrization nor of the encoding.
+
+    The parametrization is a ``nevergrad.p.Dict`` holding a single bounded ``nevergrad.p.Array``
+    with all the real and integer columns, mapped to the unit interval according to the prior
+    of their dimension, by the cumulative distribution of the prior unless it is uniform or
+    log-uniform, and a ``nevergrad.p.Choice`` for each categorical column. Nevergrad then
+    handles one vector instead of one parameter per dimension, which keeps ``ask`` and
+    ``spawn_child`` fast on large spaces. Integer columns are rounded when decoded. The
+    probabilities of categorical dimensions are ignored, with a warning.
+
+    Parameters
+    ----------
+    space: `orion.algo.space.Space`
+        Optimisation space with priors for each dimension.
+    seed: None or str
+        Name of the dimension of the seeds of the evaluations, if any.
+
+    """
+
+    def __init__(self, space, seed=None):
+        self.names = []
+        self.shapes = []
+        self.slices = []
+        self.fidelity = None
+        self.seed = seed
+        self.categories = {}
+        self._category_index = {}
+        # Columns of the encoding and of the unit array of each real or integer dimension, with
+        # the mapping of its values to the unit interval.
+        self._transforms = []
+        # Columns of the encoding of categorical dimensions.
+        self._choices = []
+
+        lower, upper, integer = [], [], []
+        start = 0
+        unit_size = 0
+        for name, dim in space.items():
+            if dim.type == "fidelity":
+                self.fidelity = name
+                continue
+            if name == seed:
+                continue
+
+            shape = tuple(int(size) for size in dim.shape or ())
+            size = int(numpy.prod(shape))
+            self.names.append(name)
+            self.shapes.append(shape)
+            self.slices.append(slice(start, start + size))
+
+            if dim.type == "categorical":
+                choices = dim.interval()
+                self.categories[name] = numpy.empty(len(choices), dtype=object)
+                self.categories[name][:] = choices
+                self._category_index[name] = {
+                    choice: index for index, choice in enumerate(choices)
+                }
+                self._choices.extend(range(start, start + size))
+                bounds = (0, len(choices) - 1)
+                if len(set(dim._probs)) != 1:  # pylint:disable=protected-access
+                    logger.warning(
+                        "Categorical dimension %s has non-uniform probabilities, nevergrad "
+                        "will ignore them.",
+                        name,
+                    )
+            else:
+                self._transforms.append(
+                    (
+                        slice(start, start + size),
+                        slice(unit_size, unit_size + size),
+                        self._transform(dim),
+                    )
+                )
+                unit_size += size
+                bounds = dim.interval()
+
+            lower.extend([float(bounds[0])] * size)
+            upper.extend([float(bounds[1])] * size)
+            integer.extend([dim.type != "real"] * size)
+            start += size
+
+        self.size = start
+        self.lower = numpy.array(lower)
+        self.upper = numpy.array(upper)
+        self.integer = numpy.array(integer, dtype=bool)
+        # Number of values of each column if all the dimensions are discrete and bounded.
+        self.grid_shape = None
+        if (
+            self.size
+            and self.integer.all()
+            and numpy.isfinite(self.lower).all()
+            and numpy.isfinite(self.upper).all()
+        ):
+            self.grid_shape = tuple(
+                (self.upper - self.lower + 1).astype(numpy.int64).tolist()
+            )
+
+        self.parametrization = self._make_parametrization(unit_size)
+
+    def _make_parametrization(self, unit_size):
+        parameters = {}
+        if unit_size:
+            parameters["unit"] = ng.p.Array(
+                init=numpy.full(unit_size, 0.5), lower=0.0, upper=1.0
+            )
+        for column in self._choices:
+            parameters["choice{}".format(column)] = ng.p.Choice(
+                int(self.upper[column]) + 1
+            )
+        return ng.p.Dict(**parameters)
+
+    @staticmethod
+    def _transform(dim):
+        # Priors without a dedicated converter are mapped by their cumulative distribution.
+        return converters.get((dim.type, dim.prior_name), _Prior)(dim)
+
+    def register_constraint(self, constraint):
+        """Register a constraint on params as a cheap constraint of the parametrization.
+
+        Parameters
+        ----------
+        constraint: callable
+            Function of a dictionary of numpy arrays of values per dimension, like the ones
+            returned by `columns`, returning whether they satisfy the constraint.
+
+        """
+        self.parametrization.register_cheap_constraint(
+            _ValueConstraint(self, constraint)
+        )
+
+    def from_values(self, values):
+        """Encode a batch of values of the parametrization in a flat numpy array.
+
+        Parameters
+        ----------
+        values: list of dict
+            Values of candidates of the parametrization.
+
+        Returns
+        -------
+        ``numpy.ndarray`` of shape ``(len(values), self.size)``
+
+        """
+        data = numpy.empty((len(values), self.size))
+        if self._transforms:
+            unit = numpy.array([value["unit"] for value in values]).reshape(
+                len(values), -1
+            )
+            for columns, unit_columns, transform in self._transforms:
+                data[:, columns] = transform.from_unit(unit[:, unit_columns])
+        for column in self._choices:
+            key = "choice{}".format(column)
+            data[:, column] = [value[key] for value in values]
+
+        return data
+
+    def to_values(self, data):
+        """Decode a flat numpy array in a batch of values of the parametrization.
+
+        Parameters
+        ----------
+        data: ``numpy.ndarray`` of shape ``(n, self.size)``
+
+        Returns
+        -------
+        list of dict
+            Values of the parametrization, to spawn candidates with.
+
+        """
+        values = [{} for _ in range(len(data))]
+        if self._transforms:
+            unit = numpy.empty((len(data), self._transforms[-1][1].stop))
+            for columns, unit_columns, transform in self._transforms:
+                unit[:, unit_columns] = transform.to_unit(data[:, columns])
+            for value, row in zip(values, numpy.clip(unit, 0.0, 1.0)):
+                value["unit"] = row
+        for column in self._choices:
+            key = "choice{}".format(column)
+            indices = numpy.rint(data[:, column]).astype(int).tolist()
+            for value, index in zip(values, indices):
+                value[key] = index
+
+        return values
+
+    def grid_points(self, indices):
+        """Encode the points at given flat indices of the grid of a discrete space.
+
+        Parameters
+        ----------
+        indices: ``numpy.ndarray`` of int
+
+        Returns
+        -------
+        ``numpy.ndarray`` of shape ``(len(indices), self.size)``
+
+        """
+        coordinates = numpy.unravel_index(indices, self.grid_shape)
+        return self.lower + numpy.stack(coordinates, axis=1)
+
+    def encode(self, params):
+        """Encode a batch of parameters in a flat numpy array.
+
+        Parameters
+        ----------
+        params: list of dict
+            Parameters indexed by dimension names. Fidelity and seed dimensions are ignored.
+
+        Returns
+        -------
+        ``numpy.ndarray`` of shape ``(len(params), self.size)``
+
+        """
+        data = numpy.empty((len(params), self.size))
+        for name, shape, columns in zip(self.names, self.shapes, self.slices):
+            values = [point[name] for point in params]
+            if name in self._category_index:
+                index = self._category_index[name]
+                if shape:
+                    values = [
+                        [index[item] for item in numpy.ravel(value)] for value in values
+                    ]
+                else:
+                    values = [index[value] for value in values]
+            data[:, columns] = numpy.reshape(
+                values, (len(params), columns.stop - columns.start)
+            )
+
+        return data
+
+    def decode(self, data):
+        """Decode a flat numpy array in a batch of parameters.
+
+        Values are clipped to the bounds of the dimensions and integer and categorical
+        dimensions are rounded in a single vectorized pass.
+
+        Parameters
+        ----------
+        data: ``numpy.ndarray`` of shape ``(n, self.size)``
+
+        Returns
+        -------
+        list of dict
+            Parameters indexed by dimension names.
+
+        """
+        columns = self.columns(data)
+        values = [
+            list(columns[name]) if shape else columns[name].tolist()
+            for name, shape in zip(self.names, self.shapes)
+        ]
+        return [dict(zip(self.names, point)) for point in zip(*values)]
+
+    def columns(self, data):
+        """Decode a flat numpy array in a numpy array of values per dimension.
+
+        Parameters
+        ----------
+        data: ``numpy.ndarray`` of shape ``(n, self.size)``
+
+        Returns
+        -------
+        dict of ``numpy.ndarray``
+            Values of each dimension, indexed by dimension names. Arrays are of shape
+            ``(n,) + shape`` of the dimension, and of dtype object for categorical dimensions.
+
+        """
+        data = numpy.where(self.integer, numpy.rint(data), data)
+        data = numpy.clip(data, self.lower, self.upper)
+
+        columns = {}
+        for name, shape, dim_columns in zip(self.names, self.shapes, self.slices):
+            block = data[:, dim_columns]
+            if name in self.categories:
+                columns[name] = self.categories[name][
+                    block.astype(int).reshape((len(data),) + shape)
+                ]
+            elif shape:
+                columns[name] = block.reshape((len(data),) + shape)
+            elif self.integer[dim_columns.start]:
+                columns[name] = block[:, 0].astype(int)
+            else:
+                columns[name] = block[:, 0]
+
+        return columns
+
+    @staticmethod
+    def keys(data):
+        """Compute canonical hashable keys for a batch of encoded parameters.
+
+        Values are quantized to ``KEY_SIGNIFICANT_DIGITS`` significant digits so that parameters
+        going through lossy conversions, like Oríon's precision transformation or a round trip
+        to the storage, are mapped to the same key.
+
+        Parameters
+        ----------
+        data: ``numpy.ndarray`` of shape ``(n, self.size)``
+
+        Returns
+        -------
+        list of bytes
+
+        """
+        data = numpy.asarray(data, dtype=float)
+        magnitude = numpy.abs(data)
+        exponent = numpy.floor(
+            numpy.log10(magnitude, out=numpy.zeros_like(data), where=magnitude > 0)
+        )
+        scale = 10.0 ** (KEY_SIGNIFICANT_DIGITS - 1 - exponent)
+        # Adding 0.0 turns negative zeros into positive ones.
+        quantized = numpy.rint(data * scale) / scale + 0.0
+        return [row.tobytes() for row in quantized]
@@ -0,0 +1,127 @@
+"""
+:mod:`orion.algo.nevergrad.halving -- Successive halving over a fidelity dimension
+==================================================================================
+
+The budgets of a fidelity dimension are split in rungs, and the best trials of each rung are
+promoted to the next one.
+"""
+import numbers
+
+import numpy
+
+
+def fidelity_budgets(dim):
+    """Compute the budgets of the rungs of successive halving for a fidelity dimension.
+
+    Budgets are spaced geometrically, by a factor close to the base of the dimension, from its
+    lower bound to its upper bound.
+
+    Parameters
+    ----------
+    dim: `orion.algo.space.Fidelity`
+        Fidelity dimension of the space.
+
+    Returns
+    -------
+    list
+        Budgets of the rungs, in increasing order.
+
+    """
+    low, high = dim.interval()
+    if dim.base <= 1 or low >= high:
+        return [high]
+
+    log_base = numpy.log(dim.base)
+    # The tolerance keeps exact powers of the base, like 1000 in base 10, from losing a rung
+    # to rounding errors of the logarithms.
+    num_rungs = max(int(numpy.floor(numpy.log(high / low) / log_base + 1e-9)) + 1, 2)
+    budgets = numpy.logspace(
+        numpy.log(low) / log_base, numpy.log(high) / log_base, num_rungs, base=dim.base
+    )
+    # The bounds are set back exactly, since the exponentiation of their logarithms is not.
+    budgets[0] = low
+    budgets[-1] = high
+    if isinstance(low, numbers.Integral) and isinstance(high, numbers.Integral):
+        budgets = numpy.unique(numpy.rint(budgets).astype(int))
+
+    return budgets.tolist()
+
+
+class SuccessiveHalving:
+    """Rungs of successive halving over a fidelity dimension.
+
+    The objective of a trial is recorded in the rung of its budget, and the best ``1 / base``
+    trials of a rung are promoted to the next one.
+
+    Parameters
+    ----------
+    dim: `orion.algo.space.Fidelity`
+        Fidelity dimension of the space.
+
+    """
+
+    def __init__(self, dim):
+        self.budgets = fidelity_budgets(dim)
+        self.reduction_factor = dim.base
+        self._rung_index = {budget: rung for rung, budget in enumerate(self.budgets)}
+        # Objectives of each rung and keys of the trials promoted from them.
+        self.rungs = [{} for _ in self.budgets]
+        self.promoted = [set() for _ in self.budgets]
+
+    def record(self, budget, key, objective):
+        """Record the first objective of a trial in the rung of its budget, if there is one"""
+        rung = self._rung_index.get(budget)
+        if rung is not None:
+            self.rungs[rung].setdefault(key, objective)
+
+    def best(self, rung, final=False):
+        """Keys of the best ``1 / base`` trials of a rung not promoted yet, best first.
+
+        If `final`, the rung will not get more results and its best trial is returned even if
+        it holds less than ``base`` results.
+        """
+        results = self.rungs[rung]
+        num_best = int(len(results) // self.reduction_factor)
+        if final:
+            num_best = max(num_best, min(len(results), 1))
+        if not num_best:
+            return []
+
+        keys = list(results)
+        objectives = numpy.fromiter(results.values(), dtype=float, count=len(keys))
+        best = numpy.argpartition(objectives, num_best - 1)[:num_best]
+        best = best[numpy.argsort(objectives[best])]
+        return [keys[index] for index in best if keys[index] not in self.promoted[rung]]
+
+    def final_rung(self, pending=()):
+        """Lowest rung whose best trial can be promoted even if it holds less than ``base``
+        results, see `best`.
+
+        The lowest rung is assumed not to get more results than the pending ones. A rung only
+        gets more results once the ones below it promote trials, so it is final once no rung
+        below it can promote trials and no trial is pending at its budget or a lower one.
+
+        Parameters
+        ----------
+        pending: iterable of int or float
+            Budgets of the trials that are pending.
+
+        Returns
+        -------
+        int or None
+            None if no rung is final or has a trial left to promote.
+
+        """
+        rungs = [
+            self._rung_index[budget] for budget in pending if budget in self._rung_index
+        ]
+        for rung in range(min(rungs + [len(self.budgets) - 1])):
+            if self.best(rung):
+                return None
+            if self.best(rung, final=True):
+                return rung
+        return None
+
+    def can_promote(self, final=False):
+        """Whether trials of any rung but the last can be promoted, see `best`"""
+        return any(self.best(rung, final) for rung in range(len(self.budgets) - 1))
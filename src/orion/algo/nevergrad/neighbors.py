@@ -0,0 +1,229 @@
+"""
+:mod:`orion.algo.nevergrad.neighbors -- Nearest neighbors of encoded params
+===========================================================================
+
+Encoded params are indexed for nearest neighbor queries, which are used to reject
+near-duplicates, select diverse batches and predict objectives.
+"""
+import collections
+import time
+
+import numpy
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+#: Number of points added to a `NeighborIndex` before its KD-tree is rebuilt.
+NEIGHBOR_REBUILD_SIZE = 1024
+
+#: Number of neighbors whose objectives are averaged by `KNNSurrogate`.
+SURROGATE_NEIGHBORS = 5
+
+
+def unit_scaling(lower, upper):
+    """Offset and scale mapping bounded columns to the unit interval.
+
+    Columns with infinite bounds are left as-is.
+    """
+    bounded = numpy.isfinite(lower) & numpy.isfinite(upper) & (upper > lower)
+    return numpy.where(bounded, lower, 0.0), numpy.where(bounded, upper - lower, 1.0)
+
+
+def select_diverse(points, num):
+    """Select `num` points greedily maximizing the minimum distance between them.
+
+    The first point is always selected. Each following one is the point farthest from the
+    points already selected.
+
+    Parameters
+    ----------
+    points: ``numpy.ndarray`` of shape ``(n, d)``
+    num: int
+
+    Returns
+    -------
+    list of int
+        Indices of the selected points, in order of selection.
+
+    """
+    selected = [0]
+    distances = numpy.sqrt(((points - points[0]) ** 2).sum(axis=1))
+    for _ in range(1, min(num, len(points))):
+        index = int(numpy.argmax(distances))
+        selected.append(index)
+        distances = numpy.minimum(
+            distances, numpy.sqrt(((points - points[index]) ** 2).sum(axis=1))
+        )
+
+    return selected
+
+
+class NeighborIndex:
+    """Index of encoded points, normalized by the bounds of their columns, for nearest
+    neighbor queries.
+
+    Points are indexed in a ``scipy.spatial.cKDTree``, which is rebuilt once
+    ``NEIGHBOR_REBUILD_SIZE`` points were added since the last build. The points added since
+    then are searched by brute force. Without scipy, all the points are searched by brute force
+    with numpy. The tree is not pickled and is rebuilt by the first query after unpickling.
+
+    Parameters
+    ----------
+    lower: ``numpy.ndarray``
+        Lower bounds of the columns of the points.
+    upper: ``numpy.ndarray``
+        Upper bounds of the columns of the points. Columns with infinite bounds are not scaled.
+
+    """
+
+    def __init__(self, lower, upper):
+        self.offset, self.scale = unit_scaling(lower, upper)
+        self.keys = []
+        self._key_set = set()
+        self._points = numpy.empty((NEIGHBOR_REBUILD_SIZE, len(lower)))
+        self._tree = None
+        self._num_indexed = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_points"] = self._points[: len(self.keys)]
+        state["_tree"] = None
+        state["_num_indexed"] = 0
+        return state
+
+    def add(self, data, keys):
+        """Add encoded points with their keys, unless their key is already indexed"""
+        for point, key in zip((data - self.offset) / self.scale, keys):
+            if key in self._key_set:
+                continue
+            size = len(self.keys)
+            if size == len(self._points):
+                self._points = numpy.resize(
+                    self._points, (max(2 * size, 1), self._points.shape[1])
+                )
+            self._points[size] = point
+            self.keys.append(key)
+            self._key_set.add(key)
+
+    def nearest(self, data):
+        """Find the nearest indexed point of each encoded point.
+
+        Returns
+        -------
+        tuple of ``numpy.ndarray`` and list of keys
+            The distances to the nearest indexed points and their keys. The index must not be
+            empty.
+
+        """
+        distances, indices = self.neighbors(data, 1)
+        return distances[:, 0], [self.keys[index] for index in indices[:, 0]]
+
+    def neighbors(self, data, k):
+        """Find the `k` nearest indexed points of each encoded point.
+
+        Returns
+        -------
+        tuple of ``numpy.ndarray`` of shape ``(len(data), k)``
+            The distances to the nearest indexed points, sorted, and their indices in `keys`.
+            Missing neighbors, if there are less than `k` points indexed, are at an infinite
+            distance.
+
+        """
+        size = len(self.keys)
+        if cKDTree is not None and size - self._num_indexed >= NEIGHBOR_REBUILD_SIZE:
+            self._tree = cKDTree(self._points[:size])
+            self._num_indexed = size
+
+        points = (numpy.atleast_2d(data) - self.offset) / self.scale
+        distances = numpy.full((len(points), k), numpy.inf)
+        indices = numpy.zeros((len(points), k), dtype=int)
+        if self._tree is not None:
+            distances, indices = self._tree.query(points, k=k)
+            distances = numpy.reshape(distances, (len(points), k))
+            indices = numpy.reshape(indices, (len(points), k))
+            indices[indices >= self._num_indexed] = 0
+
+        recent = self._points[self._num_indexed : size]
+        if recent.size == 0:
+            return distances, indices
+
+        # Distances to the recent points are computed by chunks of rows to bound memory.
+        chunk_size = max(1, 2 ** 22 // recent.size)
+        all_distances = []
+        all_indices = []
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start : start + chunk_size]
+            chunk_distances = numpy.sqrt(
+                ((chunk[:, None, :] - recent[None]) ** 2).sum(axis=-1)
+            )
+            chunk_distances = numpy.concatenate(
+                [distances[start : start + chunk_size], chunk_distances], axis=1
+            )
+            chunk_indices = numpy.concatenate(
+                [
+                    indices[start : start + chunk_size],
+                    numpy.broadcast_to(
+                        numpy.arange(self._num_indexed, size), (len(chunk), len(recent))
+                    ),
+                ],
+                axis=1,
+            )
+            order = numpy.argsort(chunk_distances, axis=1, kind="stable")[:, :k]
+            all_distances.append(numpy.take_along_axis(chunk_distances, order, axis=1))
+            all_indices.append(numpy.take_along_axis(chunk_indices, order, axis=1))
+
+        return numpy.concatenate(all_distances), numpy.concatenate(all_indices)
+
+
+class KNNSurrogate:
+    """k-nearest neighbors regressor of objectives, fit incrementally.
+
+    The objective predicted for a point is the mean of the objectives of its
+    ``SURROGATE_NEIGHBORS`` nearest observed points, weighted by their inverse distance.
+    Observations are queued by `add` and moved to a `NeighborIndex` by `fit`, within a time
+    limit, so that the cost of fitting stays bounded whatever the number of new observations.
+
+    Parameters
+    ----------
+    lower: ``numpy.ndarray``
+        Lower bounds of the columns of the points.
+    upper: ``numpy.ndarray``
+        Upper bounds of the columns of the points.
+
+    """
+
+    def __init__(self, lower, upper):
+        self.index = NeighborIndex(lower, upper)
+        self.objectives = {}
+        self._queue = collections.deque()
+
+    def add(self, data, keys, objectives):
+        """Queue observations of encoded points with their keys"""
+        self._queue.extend(zip(data, keys, objectives))
+
+    def fit(self, timeout):
+        """Fit queued observations for at most `timeout` seconds, the rest stays queued"""
+        start = time.perf_counter()
+        while self._queue and time.perf_counter() - start < timeout:
+            batch = [self._queue.popleft() for _ in range(min(256, len(self._queue)))]
+            data, keys, objectives = zip(*batch)
+            self.index.add(numpy.array(data), keys)
+            for key, objective in zip(keys, objectives):
+                self.objectives.setdefault(key, objective)
+
+    def predict(self, data):
+        """Predict the objectives of encoded points. At least one point must be fit."""
+        distances, indices = self.index.neighbors(data, SURROGATE_NEIGHBORS)
+        keys = self.index.keys
+        objectives = numpy.array(
+            [[self.objectives[keys[index]] for index in row] for row in indices]
+        )
+        weights = numpy.where(
+            numpy.isinf(distances), 0.0, 1.0 / numpy.maximum(distances, 1e-12)
+        )
+        return (weights * objectives).sum(axis=1) / weights.sum(axis=1)
@@ -1,15 +1,326 @@
 """
-:mod:`orion.algo.nevergrad.nevergradoptimizer -- TODO
-=================================================
+:mod:`orion.algo.nevergrad.nevergradoptimizer -- Wrapper for nevergrad optimizers
+==================================================================================
 
-TODO: Write long description
+Expose the ask and tell interface of nevergrad optimizers to Oríon. The Oríon space is
+converted into a nevergrad parametrization, candidates asked to nevergrad are turned into
+trials in ``suggest`` and completed trials are told back to nevergrad in ``observe``.
 """
+# The wrapper exposes all the options of the algorithm in a single class.
+# pylint: disable=too-many-lines
+import collections
+import copy
+import json
+import logging
+import math
+import pickle
+import time
+import zlib
+
+import nevergrad as ng
 import numpy
 from orion.algo.base import BaseAlgorithm
+from orion.core.utils.format_trials import get_trial_results
+from orion.core.worker.trial import Trial
+
+from orion.algo.nevergrad.codec import SpaceCodec
+from orion.algo.nevergrad.halving import SuccessiveHalving
+from orion.algo.nevergrad.neighbors import (
+    KNNSurrogate,
+    NeighborIndex,
+    select_diverse,
+    unit_scaling,
+)
+from orion.algo.nevergrad.objectives import (
+    ObjectiveSummary,
+    ParetoFront,
+    RunningStats,
+    TellBuffer,
+)
+from orion.algo.nevergrad.portfolio import (
+    OptimizerPortfolio,
+    capacity,
+    is_sequential,
+    replace_lie,
+    tell_if_supported,
+)
+
+logger = logging.getLogger(__name__)
+
+#: Aliases of the nevergrad families of optimizers that can be configured in ``model_name``.
+FAMILY_ALIASES = {"Portfolio": "ConfPortfolio"}
+
+#: Minimum number of trials told at once for which warm starts are logged at INFO level.
+WARM_START_LOG_SIZE = 1000
+
+#: Functions computing provisional objectives of pending trials from the `ObjectiveSummary` of
+#: the observed ones.
+LIE_STRATEGIES = {
+    "mean": ObjectiveSummary.mean,
+    "min": ObjectiveSummary.min,
+    "max": ObjectiveSummary.max,
+}
+
+#: Fraction of extra points drawn by the fallback sampler to make up for duplicates.
+SAMPLE_MARGIN = 0.1
+
+#: Maximum number of draws of the fallback sampler per call to ``suggest``.
+SAMPLE_MAX_ATTEMPTS = 3
+
+#: Maximum size of the grid of discrete spaces enumerated instead of sampled at random.
+ENUMERATION_MAX_SIZE = 100000
+
+#: Fraction of the grid of an enumerated space suggested beyond which the rest of the grid is
+#: enumerated instead of asking candidates to nevergrad.
+ENUMERATION_FRACTION = 0.5
+
+#: Maximum number of seconds spent fitting the surrogate in each call to ``suggest``.
+SURROGATE_FIT_TIME = 0.05
+
+#: Surrogate models available to pre-screen candidates.
+SURROGATES = ("knn",)
+
+#: Quantile of the mean objectives of the repeated candidates below which a candidate is
+#: evaluated again, until it was evaluated ``repeats`` times.
+REEVALUATION_QUANTILE = 0.5
+
+# Nevergrad optimizers resolved from their configuration, indexed by the configuration in JSON.
+_resolved_optimizers = {}
+
+
+def resolve_optimizer(model_name):
+    """Resolve the configuration of a nevergrad optimizer.
+
+    Resolved optimizers are cached so that the registry is only walked once per configuration.
+
+    Parameters
+    ----------
+    model_name: str or dict
+        Name of an optimizer in ``nevergrad.optimizers.registry``, like ``"TwoPointsDE"`` or
+        ``"NGOpt"``, or a dictionary with a single item mapping the name of a family of
+        ``nevergrad.families`` to its arguments. ``"Portfolio"`` is an alias for the
+        ``"ConfPortfolio"`` family. The ``optimizers`` argument of families like ``Chaining``
+        or ``Portfolio`` is itself a list of such configurations. For instance,
+        ``{"Chaining": {"optimizers": ["LHSSearch", "TwoPointsDE"], "budgets": [20]}}``.
+
+    Returns
+    -------
+    Optimizer class or ``nevergrad.optimizers.base.ConfiguredOptimizer``
+        Factory of the optimizer, to call with the parametrization, budget and number of workers.
+
+    """
+    cache_key = json.dumps(model_name, sort_keys=True)
+    if cache_key not in _resolved_optimizers:
+        _resolved_optimizers[cache_key] = _resolve_optimizer(model_name)
+
+    return _resolved_optimizers[cache_key]
+
+
+def _resolve_optimizer(model_name):
+    if isinstance(model_name, str):
+        if model_name not in ng.optimizers.registry:
+            raise ValueError("Unknown nevergrad optimizer {}.".format(model_name))
+        return ng.optimizers.registry[model_name]
+
+    if not isinstance(model_name, dict) or len(model_name) != 1:
+        raise ValueError(
+            "Invalid nevergrad optimizer {}. Must be a name or a dictionary with a single "
+            "family name as key.".format(model_name)
+        )
+
+    ((family_name, kwargs),) = model_name.items()
+    family = getattr(ng.families, FAMILY_ALIASES.get(family_name, family_name), None)
+    if not isinstance(family, type):
+        raise ValueError(
+            "Unknown nevergrad family of optimizers {}.".format(family_name)
+        )
+
+    kwargs = dict(kwargs)
+    if "optimizers" in kwargs:
+        kwargs["optimizers"] = [
+            _resolve_optimizer(optimizer) for optimizer in kwargs["optimizers"]
+        ]
+
+    return family(**kwargs)
+
+
+def _dumps(obj):
+    """Serialize an object in a compact compressed binary blob"""
+    return zlib.compress(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(blob):
+    """Deserialize an object serialized with `_dumps`"""
+    return pickle.loads(zlib.decompress(blob))
+
+
+def _seeds(dim, repeats):
+    """Values of a dimension of seeds for `repeats` evaluations"""
+    if dim.type == "categorical":
+        seeds = list(dim.interval())
+    elif dim.type == "integer" and not dim.shape:
+        lower, upper = dim.interval()
+        seeds = list(range(int(lower), int(min(upper, lower + repeats - 1)) + 1))
+    else:
+        raise ValueError(
+            "Seed dimension {} must be integer or categorical.".format(dim.name)
+        )
+
+    if len(seeds) < repeats:
+        raise ValueError(
+            "Seed dimension {} has less than {} values.".format(dim.name, repeats)
+        )
+    return seeds[:repeats]
+
+
+class ExpressionConstraint:
+    """Constraint on params defined by a Python expression, like ``"x * y <= 100"``.
+
+    The expression is evaluated with the params as variables, along with ``numpy``. It works
+    both on the values of a single point and on numpy arrays of values of a batch of points.
+
+    Parameters
+    ----------
+    expression: str
+        Expression that is true for params satisfying the constraint.
+
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self._code = compile(expression, "<constraint>", "eval")
+
+    def __call__(self, params):
+        return eval(  # pylint:disable=eval-used
+            self._code, {"__builtins__": {}, "numpy": numpy}, dict(params)
+        )
+
+    def __getstate__(self):
+        return self.expression
+
+    def __setstate__(self, expression):
+        self.__init__(expression)
+
+
+def _check_arguments(
+    lie_strategy,
+    surrogate,
+    objectives,
+    repeats,
+    seed_dimension,
+    oversampling,
+    tell_batch_size,
+    prefetch,
+):
+    """Raise a ValueError if arguments of `NevergradOptimizer` are invalid or incompatible"""
+    for name, value, minimum in (
+        ("oversampling", oversampling, 1),
+        ("tell_batch_size", tell_batch_size, 1),
+        ("repeats", repeats, 1),
+        ("prefetch", prefetch, 0),
+    ):
+        if value < minimum:
+            raise ValueError(
+                "Invalid {} {}, must be at least {}.".format(name, value, minimum)
+            )
+
+    if lie_strategy is not None and lie_strategy not in LIE_STRATEGIES:
+        raise ValueError(
+            "Invalid lie_strategy {}, must be None or one of {}.".format(
+                lie_strategy, sorted(LIE_STRATEGIES)
+            )
+        )
+
+    if surrogate is not None and surrogate not in SURROGATES:
+        raise ValueError(
+            "Invalid surrogate {}, must be None or one of {}.".format(
+                surrogate, list(SURROGATES)
+            )
+        )
+
+    if surrogate is not None and oversampling <= 1:
+        raise ValueError(
+            "surrogate requires an oversampling greater than 1 to select candidates."
+        )
+
+    if objectives is not None and len(objectives) > 1 and lie_strategy is not None:
+        raise ValueError("lie_strategy cannot be used with several objectives.")
+
+    if repeats > 1 and seed_dimension is None:
+        raise ValueError("repeats requires a seed_dimension to tell evaluations apart.")
+
+
+def _make_constraints(constraints, codec):
+    """Convert expressions to `ExpressionConstraint`, check that constraints can be pickled and
+    register them as cheap constraints of the parametrization of a `SpaceCodec`"""
+    constraints = [
+        constraint if callable(constraint) else ExpressionConstraint(constraint)
+        for constraint in constraints or []
+    ]
+    for constraint in constraints:
+        try:
+            pickle.dumps(constraint)
+        except (pickle.PicklingError, AttributeError, TypeError) as exc:
+            raise ValueError(
+                "Constraint {} cannot be pickled along with the state of the algorithm. "
+                "Use a module-level function or an expression string.".format(
+                    constraint
+                )
+            ) from exc
+        codec.register_constraint(constraint)
+
+    return constraints
+
+
+def _make_optimizer(model_name, parametrization, budget, num_workers, n_jobs):
+    """Create the nevergrad optimizer, or an `OptimizerPortfolio` if `model_name` is a list"""
+    if isinstance(model_name, (list, tuple)):
+        return OptimizerPortfolio(
+            [
+                resolve_optimizer(name)(
+                    parametrization=parametrization.copy(),
+                    budget=budget,
+                    num_workers=num_workers,
+                )
+                for name in model_name
+            ],
+            n_jobs=n_jobs,
+        )
+
+    return resolve_optimizer(model_name)(
+        parametrization=parametrization, budget=budget, num_workers=num_workers
+    )
+
+
+def _enumerable_size(grid_shape):
+    """Size of the grid of a discrete space, if it is small enough to be enumerated"""
+    if grid_shape is None:
+        return None
+
+    size = int(numpy.prod(grid_shape, dtype=float))
+    return size if size <= ENUMERATION_MAX_SIZE else None
+
+
+def _is_pending(trial, results):
+    """Whether a trial registered with its results is neither completed nor broken"""
+    return results is None and trial.status != "broken"
+
+
+class NevergradOptimizer(BaseAlgorithm):  # pylint: disable=too-many-instance-attributes
+    """Wrapper for nevergrad optimizers
 
+    Candidates are asked to the nevergrad optimizer in ``suggest`` and the objectives of
+    completed trials are told back in ``observe``. Trials observed without having been suggested
+    are told to nevergrad as points that were not asked.
 
-class NevergradOptimizer(BaseAlgorithm):
-    """TODO: Class docstring
+    If the space has a fidelity dimension, it is left out of the nevergrad parametrization and
+    driven by successive halving. New candidates are suggested at the lowest budget and the
+    objective told to nevergrad is the one obtained at that budget. Each time a rung holds
+    ``base`` times more results than promotions, its best trials are suggested again at the
+    budget of the next rung, up to the upper bound of the fidelity dimension. Once the grid of an
+    enumerated space was suggested, the best trial of each rung is promoted even if the rung
+    holds less than ``base`` results, from the lowest rung to the highest, as soon as the trials
+    at its budget and the lower ones completed and no lower rung can promote trials.
 
     Parameters
     ----------
@@ -18,6 +329,124 @@ class NevergradOptimizer(BaseAlgorithm):
     seed: None, int or sequence of int
         Seed for the random number generator used to sample new trials.
         Default: ``None``
+    model_name: str, dict or list
+        Nevergrad optimizer to use. Either the name of an optimizer of nevergrad's registry or
+        the configuration of a family of optimizers, like ``Chaining`` or ``Portfolio``.
+        See `resolve_optimizer`. A list of such configurations creates an
+        `OptimizerPortfolio`, which races the optimizers and gives more candidates to the ones
+        with the best recent improvements.
+        Default: ``"TwoPointsDE"``
+    budget: int
+        Number of trials the nevergrad optimizer expects to evaluate. Optimizers like ``NGOpt``
+        or ``Chaining`` use it to select or schedule their sub-optimizers.
+        Default: 100
+    num_workers: int
+        Number of candidates the nevergrad optimizer can have pending at the same time. This
+        should match the number of Oríon workers, which is the ``num`` Oríon's producer uses when
+        calling ``suggest``. Population-based optimizers size their population accordingly.
+        Default: 10
+    lie_strategy: None or str
+        Strategy used to compute provisional objectives, or lies, for the pending trials. One of
+        ``"mean"``, ``"min"`` or ``"max"`` of the observed objectives. When set, the lie is told
+        to nevergrad for all pending candidates each time ``suggest`` is called, so that
+        optimizers do not propose again points near the pending ones. Sequential optimizers are
+        also told the lie for each candidate they proposed within ``suggest``, so that they can
+        provide a whole batch of candidates at once. Lies are retracted once
+        the actual objectives are observed. Optimizers that cannot be told points they did not
+        ask, and raise ``TellNotAskedNotSupportedError``, only have the lie replaced in their
+        archive and keep it in their internal state. If ``None``, nevergrad only learns of
+        pending trials once they are completed.
+        Default: ``None``
+    n_jobs: int
+        Number of processes used to run the optimizers of a portfolio in parallel. Ignored
+        unless ``model_name`` is a list.
+        Default: 1
+    prefetch: int
+        Number of candidates asked to nevergrad in advance, at the end of ``observe``, and
+        converted to trials ready to be returned by ``suggest``. This keeps the latency of
+        ``suggest`` low when many workers request trials at once. Prefetched candidates are
+        discarded once ``num_workers`` results were told since they were asked, as population
+        optimizers would have moved to a new generation. Sequential optimizers do not prefetch.
+        With ``oversampling``, ``oversampling`` times more candidates are prefetched and the
+        trials suggested are selected from them like asked candidates.
+        Default: 0
+    tell_batch_size: int
+        Number of objectives observed before they are told to nevergrad. Optimizers in batch
+        mode only update once per generation, so the objectives can be buffered and told in
+        generation-sized batches, like ``num_workers``. Default is to tell objectives as soon as
+        they are observed.
+        Default: 1
+    tell_interval: None or float
+        Maximum number of seconds objectives stay buffered before being told to nevergrad,
+        whatever ``tell_batch_size``. The buffer is also flushed when ``suggest`` could
+        otherwise not ask any candidate. If ``None``, only ``tell_batch_size`` applies.
+        Default: ``None``
+    n_initial_points: int
+        Number of trials of the initial design, suggested before any candidate is asked to the
+        nevergrad optimizer. The whole design is generated at once and its trials are told to
+        the optimizer as new candidates once completed.
+        Default: 0
+    initial_design: str
+        Nevergrad one-shot optimizer generating the initial design, like ``"LHSSearch"``,
+        ``"ScrHammersleySearch"`` or ``"ScrHaltonSearch"``.
+        Default: ``"LHSSearch"``
+    epsilon: None or float
+        Minimum distance between the params of the trials suggested, once normalized by the
+        bounds of the dimensions. Candidates closer than ``epsilon`` to a trial already
+        suggested are handled like duplicates: they are told the objective of that trial and
+        other candidates are asked instead. The trials are indexed in a KD-tree if scipy is
+        installed. If ``None``, only exact duplicates are rejected.
+        Default: ``None``
+    oversampling: int
+        Factor by which nevergrad is asked more candidates than the trials to suggest. A
+        diverse subset of the candidates is then selected with `select_diverse`, on their
+        params normalized by the bounds of the dimensions, and the other candidates are
+        dropped. This spreads large batches of trials, at the cost of asking more candidates.
+        Sequential optimizers cannot be asked more than one candidate at a time and are not
+        affected.
+        Default: 1
+    surrogate: None or str
+        Surrogate model pre-screening the candidates asked with ``oversampling``. Instead of a
+        diverse subset, the candidates with the best objectives predicted by the surrogate are
+        suggested. Only ``"knn"``, a `KNNSurrogate`, is available. It is fit incrementally on
+        the observed trials, for at most ``SURROGATE_FIT_TIME`` seconds per ``suggest``.
+        Requires ``oversampling`` greater than 1.
+        Default: ``None``
+    constraints: None or list of callable or str
+        Cheap constraints on the params of the trials, as module-level functions of a dictionary
+        of params returning whether they are satisfied, or as Python expressions like
+        ``"batch_size * seq_len <= 4096"``. They are registered as cheap constraints of the
+        nevergrad parametrization, and evaluated on whole batches of candidates before they are
+        converted to trials, with a numpy array of values for each dimension, so they should be
+        written with numpy operators rather than ``and`` or ``if``. Candidates violating them
+        are not suggested, and are told the worst objective observed if there is one.
+        The fidelity dimension cannot be constrained. Functions are pickled with the state of
+        the algorithm, so lambdas and nested functions are rejected.
+        Default: ``None``
+    objectives: None or list of str
+        Names of the results of the trials, of type objective or statistic, to minimize
+        together. They are told to nevergrad as multi-objective losses and the non-dominated
+        trials among the ones told are kept in `pareto_front`. With a fidelity dimension, these
+        are the results at the lowest budget, and with ``repeats``, the means of the
+        evaluations. Results missing from a trial count as infinite. The
+        first one is used by successive halving, the surrogate and portfolios, which only rank
+        single objectives. Lies cannot be told with several objectives. If ``None``, only the
+        objective of the trials is minimized.
+        Default: ``None``
+    repeats: int
+        Maximum number of evaluations of each candidate, for noisy objectives. Each evaluation
+        is a trial with another value of ``seed_dimension``. Once evaluated, a candidate is
+        suggested again if the mean of its objective is below the ``REEVALUATION_QUANTILE`` of
+        the means of the candidates evaluated so far, so that evaluations are spent on the
+        promising ones. The mean of its evaluations is told to nevergrad once it is not
+        suggested again. Means and variances are kept in a `RunningStats`.
+        Default: 1
+    seed_dimension: None or str
+        Name of an integer or categorical dimension of the space holding the seed of the
+        evaluations. It is left out of the nevergrad parametrization and set to its ``i``-th
+        value, from the lower bound or the first category, for the ``i``-th evaluation of a
+        candidate. Required if ``repeats`` is more than 1.
+        Default: ``None``
 
     """
 
@@ -25,43 +454,779 @@ class NevergradOptimizer(BaseAlgorithm):
     requires_dist = None
     requires_shape = None
 
-    def __init__(self, space, seed=None):
-        super(NevergradOptimizer, self).__init__(space, seed=seed)
+    # Attributes serialized along with the optimizer and deserialized on first use.
+    _lazy_attributes = (
+        "_algo",
+        "_pending",
+        "_told",
+        "_told_summary",
+        "_lied",
+        "_halving",
+        "_prefetched",
+        "_tell_buffer",
+        "_initial_design",
+        "_neighbors",
+        "_surrogate",
+        "_pareto_front",
+        "_evaluations",
+        "_reevaluations",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        space,
+        seed=None,
+        model_name="TwoPointsDE",
+        budget=100,
+        num_workers=10,
+        lie_strategy=None,
+        n_jobs=1,
+        prefetch=0,
+        tell_batch_size=1,
+        tell_interval=None,
+        n_initial_points=0,
+        initial_design="LHSSearch",
+        epsilon=None,
+        oversampling=1,
+        surrogate=None,
+        constraints=None,
+        objectives=None,
+        repeats=1,
+        seed_dimension=None,
+    ):
+        _check_arguments(
+            lie_strategy,
+            surrogate,
+            objectives,
+            repeats,
+            seed_dimension,
+            oversampling,
+            tell_batch_size,
+            prefetch,
+        )
+
+        # Values of the seed dimension of each evaluation of a candidate.
+        self._seeds = []
+        if seed_dimension is not None:
+            self._seeds = _seeds(space[seed_dimension], repeats)
+
+        self._codec = SpaceCodec(space, seed_dimension)
+        self._constraints = _make_constraints(constraints, self._codec)
+        # Rungs of successive halving, if the space has a fidelity dimension.
+        self._halving = None
+        if self._codec.fidelity is not None:
+            self._halving = SuccessiveHalving(space[self._codec.fidelity])
+        self._algo = _make_optimizer(
+            model_name, self._codec.parametrization, budget, num_workers, n_jobs
+        )
+        self._algo.enable_pickling()
+        # Serialized optimizer and candidates restored by set_state but not loaded yet.
+        self._algo_blob = None
+        # Candidates of suggested trials waiting for a result, indexed by keys of their params.
+        self._pending = {}
+        # Objectives told to nevergrad, indexed by keys of their params.
+        self._told = {}
+        # Summary of the finite objectives told, to compute lies and penalties in O(1).
+        self._told_summary = ObjectiveSummary(len(objectives or [None]))
+        # Candidates of pending trials that were told a lie, indexed by keys of their params.
+        self._lied = {}
+        # Prefetched trials with their id, candidates and the number of results told when they
+        # were asked, indexed by keys of their params.
+        self._prefetched = {}
+        self._tell_buffer = TellBuffer(tell_batch_size, len(objectives or [None]))
+        # Encoded points of the initial design not suggested yet, generated on first suggest.
+        self._initial_design = None
+        if n_initial_points:
+            resolve_optimizer(initial_design)
+        # Ids of the trials already processed by observe, completed or not, None until they are
+        # loaded from the blob restored by set_state. The blob is kept until new ids are added.
+        self._observed_ids = set()
+        self._registered_ids = set()
+        self._trial_ids_blob = None
+        self._is_done = False
+        # Index of the params of suggested and observed trials, to find near-duplicates.
+        self._neighbors = None
+        if epsilon is not None:
+            self._neighbors = NeighborIndex(self._codec.lower, self._codec.upper)
+        # Surrogate model of the objectives of observed trials.
+        self._surrogate = None
+        if surrogate is not None:
+            self._surrogate = KNNSurrogate(self._codec.lower, self._codec.upper)
+        # Non-dominated trials observed, if there are several objectives.
+        self._pareto_front = ParetoFront() if objectives else None
+        # Statistics of the evaluations of the candidates and keys of the candidates to
+        # suggest again, if they are evaluated several times.
+        self._evaluations = None
+        self._reevaluations = collections.deque()
+        if repeats > 1:
+            self._evaluations = RunningStats(len(objectives or [None]))
+        # Size of the grid of the space if it is enumerated, and the multiplier, offset and
+        # cursor of the permutation of its indices, drawn on first use.
+        self._grid_size = _enumerable_size(self._codec.grid_shape)
+        self._grid = None
+        # Number of completed and broken trials registered and cardinality of the space, kept so
+        # that is_done does not go through all the trials or dimensions.
+        self._n_observed = 0
+        self._n_broken = 0
+        self._cardinality = None
+        # Number of pending trials at each budget of successive halving.
+        self._pending_budgets = collections.Counter()
+        # Generator of the sampling done by the algorithm itself, set by `seed_rng`.
+        self._rng = None
+        super(NevergradOptimizer, self).__init__(
+            space,
+            seed=seed,
+            model_name=model_name,
+            budget=budget,
+            num_workers=num_workers,
+            lie_strategy=lie_strategy,
+            n_jobs=n_jobs,
+            prefetch=prefetch,
+            tell_batch_size=tell_batch_size,
+            tell_interval=tell_interval,
+            n_initial_points=n_initial_points,
+            initial_design=initial_design,
+            epsilon=epsilon,
+            oversampling=oversampling,
+            surrogate=surrogate,
+            constraints=constraints,
+            objectives=objectives,
+            repeats=repeats,
+            seed_dimension=seed_dimension,
+        )
+
+    @property
+    def algo(self):
+        """Nevergrad optimizer, deserialized on first access after `set_state`"""
+        self._materialize()
+        return self._algo
+
+    def _materialize(self):
+        """Deserialize the optimizer and its candidates if `set_state` deferred it"""
+        if self._algo_blob is None:
+            return
+
+        for name, value in _loads(self._algo_blob).items():
+            setattr(self, name, value)
+        self._algo_blob = None
 
     def seed_rng(self, seed):
-        """Seed the state of the random number generator.
+        """Seed the state of the random number generators.
+
+        Independent streams are spawned from a ``numpy.random.SeedSequence`` of the seed, one for
+        the parametrization of each nevergrad optimizer, including the optimizers of a
+        portfolio, and one for the sampling done by the algorithm itself. All of them use the
+        PCG64 bit generator, whose state is two 128-bit integers instead of the 624 words of the
+        Mersenne Twister.
 
         Parameters
         ----------
-        seed: int
-            Integer seed for the random number generator.
+        seed: None, int or sequence of int
+            Seed for the random number generators.
 
         """
-        # TODO: Adapt this to your algo
-        self.rng = numpy.random.RandomState(seed)
+        optimizers = getattr(self.algo, "optimizers", [self.algo])
+        sequences = numpy.random.SeedSequence(seed).spawn(len(optimizers) + 1)
+        self._rng = numpy.random.Generator(numpy.random.PCG64(sequences[0]))
+        for optimizer, sequence in zip(optimizers, sequences[1:]):
+            optimizer.parametrization.random_state = numpy.random.RandomState(
+                numpy.random.PCG64(sequence)
+            )
 
     @property
     def state_dict(self):
-        """Return a state dict that can be used to reset the state of the algorithm."""
+        """Return a state dict that can be used to reset the state of the algorithm.
+
+        If the optimizer was not deserialized since the last `set_state`, the blob it was
+        restored from is returned as-is. So are the ids of the processed trials until new ones
+        are observed.
+        """
         state_dict = super(NevergradOptimizer, self).state_dict
-        # TODO: Adapt this to your algo
-        state_dict["rng_state"] = self.rng.get_state()
+        if self._algo_blob is not None:
+            state_dict["algo"] = self._algo_blob
+        else:
+            # Candidates are pickled along with the optimizer to preserve references.
+            state_dict["algo"] = _dumps(
+                {name: getattr(self, name) for name in self._lazy_attributes}
+            )
+        if self._trial_ids_blob is None:
+            self._trial_ids_blob = _dumps((self._observed_ids, self._registered_ids))
+        state_dict["_trial_ids"] = self._trial_ids_blob
+        state_dict["_is_done"] = self._is_done
+        state_dict["_n_observed"] = self._n_observed
+        state_dict["_n_broken"] = self._n_broken
+        state_dict["_pending_budgets"] = dict(self._pending_budgets)
+        state_dict["_grid"] = self._grid
+        rng_state = self._rng.bit_generator.state
+        state_dict["_rng"] = (
+            rng_state["state"]["state"],
+            rng_state["state"]["inc"],
+            rng_state["has_uint32"],
+            rng_state["uinteger"],
+        )
         return state_dict
 
     def set_state(self, state_dict):
         """Reset the state of the algorithm based on the given state_dict
 
+        The optimizer is only deserialized once `suggest` or `observe` need it, and the ids of the
+        processed trials once `observe` is called.
+
         :param state_dict: Dictionary representing state of an algorithm
         """
-        # TODO: Adapt this to your algo
         super(NevergradOptimizer, self).set_state(state_dict)
-        self.seed_rng(0)
-        self.rng.set_state(state_dict["rng_state"])
+        self._algo_blob = state_dict["algo"]
+        self._trial_ids_blob = state_dict["_trial_ids"]
+        self._observed_ids = self._registered_ids = None
+        self._is_done = state_dict["_is_done"]
+        self._n_observed = state_dict["_n_observed"]
+        self._n_broken = state_dict["_n_broken"]
+        self._pending_budgets = collections.Counter(state_dict["_pending_budgets"])
+        self._grid = state_dict["_grid"]
+        bit_generator = numpy.random.PCG64()
+        state, inc, has_uint32, uinteger = state_dict["_rng"]
+        bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": state, "inc": inc},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+        self._rng = numpy.random.Generator(bit_generator)
+
+    def _to_trials(self, data, rung=0, repeat=0):
+        """Convert a batch of encoded params to trials of the space at the budget of a rung,
+        for the evaluation `repeat` of their candidates"""
+        fidelity = {}
+        if self._codec.fidelity is not None:
+            fidelity[self._codec.fidelity] = self._halving.budgets[rung]
+        if self._codec.seed is not None:
+            fidelity[self._codec.seed] = self._seeds[repeat]
+
+        # The values are decoded within the bounds of the space, so the trials are created
+        # directly instead of going through the validation of ``dict_to_trial``.
+        dims = [(name, dim.type) for name, dim in self.space.items()]
+        return [
+            self.format_trial(
+                Trial(
+                    params=[
+                        dict(name=name, type=dim_type, value=value[name])
+                        for name, dim_type in dims
+                    ]
+                )
+            )
+            for value in (
+                dict(params, **fidelity) for params in self._codec.decode(data)
+            )
+        ]
+
+    def _warm_start(self, keys, data, objectives):
+        """Tell a batch of encoded params that were not asked to nevergrad.
+
+        This is the path taken when resuming or branching an experiment, where thousands of
+        completed trials are observed at once. The params are converted to values of the
+        parametrization in a single pass and the candidates are created and told in a tight
+        loop. Since all the real and integer columns are a single nevergrad array, spawning a
+        candidate does not depend on the number of dimensions.
+
+        Optimizers that cannot be told points they did not ask, and raise
+        ``TellNotAskedNotSupportedError``, are not told the params. Their objectives are still
+        recorded, so that they are not suggested again.
+        """
+        start = time.perf_counter()
+        algo = self.algo
+        spawn_child = algo.parametrization.spawn_child
+        told = self._told
+        summary = self._told_summary
+        supported = True
+        for key, value, objective in zip(keys, self._codec.to_values(data), objectives):
+            if supported:
+                supported = tell_if_supported(
+                    algo, spawn_child(new_value=value), objective
+                )
+            told[key] = objective
+            summary.add(objective)
+        if not supported:
+            logger.warning(
+                "Nevergrad optimizer %s cannot be told trials it did not suggest, some of the "
+                "%d trials observed were not told.",
+                algo.name,
+                len(keys),
+            )
+        if self._neighbors is not None:
+            self._neighbors.add(data, keys)
+
+        duration = time.perf_counter() - start
+        logger.log(
+            logging.INFO if len(keys) >= WARM_START_LOG_SIZE else logging.DEBUG,
+            "Warm-started nevergrad with %d trials in %.3fs (%.0f trials/s)",
+            len(keys),
+            duration,
+            len(keys) / max(duration, 1e-9),
+        )
+
+    def _tell_lies(self):
+        """Tell a provisional objective to nevergrad for the candidates of pending trials"""
+        if self.lie_strategy is None or not self._told_summary:
+            return
+
+        lie = LIE_STRATEGIES[self.lie_strategy](self._told_summary)
+        for key, candidates in self._pending.items():
+            if not candidates:
+                continue
+            for candidate in candidates:
+                self._tell_lie(candidate, lie)
+            self._lied.setdefault(key, []).extend(candidates)
+            candidates.clear()
+
+    def _flush_tells(self):
+        """Tell nevergrad all the objectives buffered in observe"""
+        for candidate, objective, is_retraction in self._tell_buffer.pop():
+            if is_retraction:
+                self._retract_lie(candidate, objective)
+            else:
+                self.algo.tell(candidate, objective)
+
+    def _tell_lie(self, candidate, lie):
+        """Tell a lie for a candidate, to be replaced later with `_retract_lie`"""
+        if isinstance(self.algo, OptimizerPortfolio):
+            self.algo.tell_lie(candidate, lie)
+        else:
+            self.algo.tell(candidate, lie)
+
+    def _drop(self, candidates):
+        """Forget candidates that were asked to nevergrad but will never be told"""
+        if isinstance(self.algo, OptimizerPortfolio):
+            self.algo.forget(candidates)
+
+    def _retract_lie(self, candidate, objective):
+        """Replace the lie told for a candidate by its actual objective, or forget it if None"""
+        if isinstance(self.algo, OptimizerPortfolio):
+            self.algo.replace_lie(candidate, objective)
+        else:
+            replace_lie(self.algo, candidate, objective)
+
+    def _num_available(self, num):
+        """Number of candidates, up to `num`, that can be asked to nevergrad right now"""
+        if self.is_done:
+            return 0
+
+        if isinstance(self.algo, OptimizerPortfolio):
+            return self.algo.num_available(num)
+        return capacity(self.algo, num)
+
+    def _ask_candidates(self, num):
+        """Ask a batch of `num` candidates to nevergrad and convert them to trials.
+
+        The candidates are converted to trials in a single pass.
+
+        Returns
+        -------
+        list of tuples (candidate, trial, key)
+
+        """
+        if isinstance(self.algo, OptimizerPortfolio):
+            candidates = self.algo.ask_batch(num)
+        else:
+            candidates = [self.algo.ask() for _ in range(num)]
+
+        data = self._codec.from_values([candidate.value for candidate in candidates])
+        if self._constraints:
+            valid = self._satisfies_constraints(data)
+            self._reject([c for c, ok in zip(candidates, valid) if not ok])
+            candidates = [c for c, ok in zip(candidates, valid) if ok]
+            data = data[valid]
+
+        trials = self._to_trials(data)
+        keys = self._codec.keys(self._codec.encode([trial.params for trial in trials]))
+        return list(zip(candidates, trials, keys))
+
+    def _satisfies_constraints(self, data):
+        """Evaluate the constraints on a batch of encoded params.
+
+        Returns
+        -------
+        ``numpy.ndarray`` of bool
+            Whether each point satisfies all the constraints.
+
+        """
+        valid = numpy.ones(len(data), dtype=bool)
+        if not valid.size:
+            return valid
+
+        columns = self._codec.columns(data)
+        for constraint in self._constraints:
+            valid &= numpy.broadcast_to(
+                numpy.asarray(constraint(columns), dtype=bool), valid.shape
+            )
+        return valid
+
+    def _worst(self):
+        """Worst finite objective told to nevergrad, infinite if there is none"""
+        if self._told_summary:
+            return self._told_summary.max()
+        if self.objectives is not None and len(self.objectives) > 1:
+            return numpy.full(len(self.objectives), numpy.inf)
+        return float("inf")
+
+    def _reject(self, candidates):
+        """Tell the worst objective observed to candidates violating the constraints"""
+        if not candidates or not self._told:
+            return
+
+        worst = self._worst()
+        for candidate in candidates:
+            self.algo.tell(candidate, worst)
+
+    def _tell_broken(self, trials):
+        """Tell a penalty to nevergrad for the candidates of broken trials.
+
+        The penalty is the mean of the evaluations of the candidate if it was evaluated before,
+        otherwise the worst objective observed, or infinity if there is none. Sequential
+        optimizers can then ask new candidates. The penalty is recorded like an observed
+        objective, so that the same params are not suggested again.
+        """
+        data = self._codec.encode([trial.params for trial in trials])
+        worst = self._worst()
+        for key in self._codec.keys(data):
+            if key not in self._pending:
+                continue
+
+            candidates = self._pending.pop(key)
+            # Lies were told in place of the objective, they are only forgotten.
+            for candidate in self._lied.pop(key, []):
+                self._retract_lie(candidate, None)
+            if self._evaluations is not None and self._evaluations.count(key):
+                penalty = self._evaluations.mean(key)
+            else:
+                penalty = worst
+            for candidate in candidates:
+                self._tell_buffer.append(candidate, penalty)
+            self._record_told(key, penalty)
+
+    def _record_told(self, key, objective):
+        """Record the objective told to nevergrad for the candidates of a trial"""
+        self._told[key] = objective
+        self._told_summary.add(objective)
+
+    def _attach(self, key, candidates):
+        """Attach candidates to the trial already suggested or told with the same params.
+
+        Returns
+        -------
+        bool
+            False if there is no such trial.
+
+        """
+        if key in self._pending:
+            self._pending[key].extend(candidates)
+        elif key in self._told:
+            for candidate in candidates:
+                self.algo.tell(candidate, self._told[key])
+        else:
+            return False
+        return True
+
+    def _attach_near_duplicate(self, trial, key, candidates):
+        """Attach candidates to a trial suggested closer than ``epsilon`` to `trial`, if any.
+
+        Otherwise the trial is added to the index of suggested trials.
+
+        Returns
+        -------
+        bool
+            False if there is no such trial.
+
+        """
+        if self._neighbors is None:
+            return False
+
+        data = self._codec.encode([trial.params])
+        if self._neighbors:
+            distances, keys = self._neighbors.nearest(data)
+            if distances[0] < self.epsilon and self._attach(keys[0], candidates):
+                return True
+
+        self._neighbors.add(data, [key])
+        return False
+
+    def _select(self, trials, keep):
+        """Indices of the `keep` trials with the best predictions, or of a diverse subset"""
+        points = self._codec.encode([trial.params for trial in trials])
+        if self._surrogate is not None and self._surrogate.index:
+            predictions = self._surrogate.predict(points)
+            return numpy.argsort(predictions, kind="stable")[:keep]
+        offset, scale = unit_scaling(self._codec.lower, self._codec.upper)
+        return select_diverse((points - offset) / scale, keep)
+
+    def _ask(self, num, keep=None):
+        """Ask a batch of `num` candidates to nevergrad and register the corresponding trials.
+
+        Candidates that are duplicates or near-duplicates of trials already suggested are not
+        returned. If `keep` is given, only `keep` of the other candidates are registered, either
+        the best ones according to the surrogate or a diverse subset, and the rest is dropped.
+        """
+        entries = []
+        for candidate, trial, key in self._ask_candidates(num):
+            if self._attach(key, [candidate]):
+                logger.debug("Ignoring duplicated trial %s", trial)
+                continue
+            entries.append((candidate, trial, key))
+
+        if keep is not None and keep < len(entries):
+            selected = self._select([trial for _, trial, _ in entries], keep)
+            dropped = numpy.ones(len(entries), dtype=bool)
+            dropped[selected] = False
+            self._drop([entries[index][0] for index in numpy.flatnonzero(dropped)])
+            entries = [entries[index] for index in selected]
+
+        trials = []
+        for candidate, trial, key in entries:
+            if self._attach(key, [candidate]) or self._attach_near_duplicate(
+                trial, key, [candidate]
+            ):
+                logger.debug("Ignoring duplicated trial %s", trial)
+                continue
+            self._pending[key] = [candidate]
+            self.register(trial)
+            trials.append(trial)
+
+        return trials
+
+    def _sample(self, num):
+        """Sample up to `num` new trials at random from the space.
+
+        The points are drawn in a single call to ``space.sample``, with a margin of
+        ``SAMPLE_MARGIN`` for duplicates. Duplicates are removed with a hash set of the keys of
+        their params before the trials are formatted and registered, and the draw is repeated
+        at most ``SAMPLE_MAX_ATTEMPTS`` times for the trials still missing.
+        """
+        trials = []
+        for _ in range(SAMPLE_MAX_ATTEMPTS):
+            missing = num - len(trials)
+            if missing <= 0:
+                break
+
+            points = self.space.sample(
+                missing + max(int(missing * SAMPLE_MARGIN), 1),
+                seed=int(self._rng.integers(2 ** 32)),
+            )
+            data = self._codec.encode([point.params for point in points])
+            seen = set()
+            unique = []
+            for index, key in enumerate(self._codec.keys(data)):
+                if key in seen or key in self._pending or key in self._told:
+                    continue
+                seen.add(key)
+                unique.append(index)
+
+            trials.extend(self._register_points(data[unique[:missing]]))
+
+        return trials
+
+    def _enumerate(self, num):
+        """Suggest up to `num` new trials from a shuffled enumeration of a discrete space.
+
+        The indices ``i`` of the grid are visited in the order of a random affine permutation
+        ``(a * i + b) % size``, so the enumeration is generated lazily and its state is three
+        integers.
+        """
+        if self._grid is None:
+            multiplier = 1
+            if self._grid_size > 2:
+                multiplier = int(self._rng.integers(1, self._grid_size))
+                while math.gcd(multiplier, self._grid_size) != 1:
+                    multiplier = int(self._rng.integers(1, self._grid_size))
+            self._grid = (multiplier, int(self._rng.integers(self._grid_size)), 0)
+
+        multiplier, offset, cursor = self._grid
+        trials = []
+        while len(trials) < num and cursor < self._grid_size:
+            stop = min(cursor + num - len(trials), self._grid_size)
+            indices = (
+                multiplier * numpy.arange(cursor, stop) + offset
+            ) % self._grid_size
+            cursor = stop
+            trials.extend(self._register_points(self._codec.grid_points(indices)))
+        self._grid = (multiplier, offset, cursor)
+
+        return trials
+
+    def _register_points(self, data):
+        """Register the trials of encoded points that were not asked to nevergrad.
+
+        The points are pending without candidates, so that they are told to nevergrad as new
+        candidates once completed. Points mapping to trials already suggested or violating the
+        constraints are ignored.
+        """
+        if self._constraints:
+            data = data[self._satisfies_constraints(data)]
+        new_trials = self._to_trials(data)
+        data = self._codec.encode([trial.params for trial in new_trials])
+        keys = self._codec.keys(data)
+        trials = []
+        for index, (trial, key) in enumerate(zip(new_trials, keys)):
+            if key in self._pending or key in self._told:
+                continue
+            self._pending[key] = []
+            self.register(trial)
+            trials.append(trial)
+            if self._neighbors is not None:
+                self._neighbors.add(data[index : index + 1], [key])
+
+        return trials
+
+    def _suggest_initial(self, num):
+        """Suggest up to `num` trials of the initial design.
+
+        The design is generated by asking all its points at once to the one-shot optimizer
+        ``initial_design``.
+        """
+        if self._initial_design is None:
+            design = resolve_optimizer(self.initial_design)(
+                parametrization=self._codec.parametrization.copy(),
+                budget=self.n_initial_points,
+                num_workers=self.n_initial_points,
+            )
+            design.parametrization.random_state = numpy.random.RandomState(
+                numpy.random.PCG64(int(self._rng.integers(2 ** 63)))
+            )
+            self._initial_design = self._codec.from_values(
+                [design.ask().value for _ in range(self.n_initial_points)]
+            )
+
+        trials = []
+        while len(trials) < num and len(self._initial_design) > 0:
+            data = self._initial_design[: num - len(trials)]
+            self._initial_design = self._initial_design[len(data) :]
+            trials.extend(self._register_points(data))
+
+        return trials
+
+    def _pop_prefetched(self, num):
+        """Register and return up to `num` prefetched trials.
+
+        The ids of prefetched trials are computed in advance, so registering them does not go
+        through the space transformations again. With ``oversampling``, up to `num` times
+        ``oversampling`` of the oldest prefetched trials are selected from like asked
+        candidates, and the others are dropped.
+        """
+        if self.oversampling > 1 and 0 < num < len(self._prefetched):
+            keys = list(self._prefetched)[: num * self.oversampling]
+            selected = self._select([self._prefetched[key][0] for key in keys], num)
+            dropped = numpy.ones(len(keys), dtype=bool)
+            dropped[selected] = False
+            for index in numpy.flatnonzero(dropped):
+                self._drop(self._prefetched.pop(keys[index])[2])
+
+        trials = []
+        while self._prefetched and len(trials) < num and not self.is_done:
+            key = next(iter(self._prefetched))
+            trial, trial_id, candidates, _ = self._prefetched.pop(key)
+            if self._attach(key, candidates) or self._attach_near_duplicate(
+                trial, key, candidates
+            ):
+                logger.debug("Ignoring duplicated trial %s", trial)
+                continue
+            self._pending[key] = candidates
+            self._trials_info[trial_id] = (copy.deepcopy(trial), None)
+            trials.append(trial)
+
+        return trials
+
+    def _prefetch(self):
+        """Discard the stale prefetched candidates and ask new ones up to ``prefetch``"""
+        num_told = len(self._told)
+        for key, (_, _, candidates, stamp) in list(self._prefetched.items()):
+            if num_told - stamp >= self.num_workers:
+                self._drop(candidates)
+                del self._prefetched[key]
+
+        algo = self.algo
+        optimizers = getattr(algo, "optimizers", [algo])
+        if any(is_sequential(optimizer) for optimizer in optimizers):
+            return
+
+        num = self._num_available(
+            self.prefetch * self.oversampling - len(self._prefetched)
+        )
+        if num <= 0:
+            return
+
+        for candidate, trial, key in self._ask_candidates(num):
+            if key in self._prefetched:
+                self._prefetched[key][2].append(candidate)
+            elif not self._attach(key, [candidate]):
+                self._prefetched[key] = (
+                    trial,
+                    self.get_id(trial),
+                    [candidate],
+                    num_told,
+                )
+
+    def _promote(self, num, final=False):
+        """Suggest again up to `num` of the best trials of each rung at the next budget.
+
+        Rungs are visited from the highest to the lowest. The best ``1 / base`` trials of a rung
+        are promoted to the next rung, unless they already were. If `final`, no trial is left to
+        add to the lowest rung. The best trial of the lowest rung that cannot get more results,
+        see `SuccessiveHalving.final_rung`, is then promoted even if the rung holds less than
+        ``base`` results.
+        """
+        trials = []
+        if self._halving is None:
+            return trials
+
+        final_rung = None
+        if final:
+            final_rung = self._halving.final_rung(+self._pending_budgets)
+        for rung in reversed(range(len(self._halving.rungs) - 1)):
+            if len(trials) >= num:
+                break
+
+            keys = self._halving.best(rung, rung == final_rung)[: num - len(trials)]
+            if not keys:
+                continue
+
+            data = numpy.array([numpy.frombuffer(key) for key in keys])
+            for key, trial in zip(keys, self._to_trials(data, rung + 1)):
+                self._halving.promoted[rung].add(key)
+                if not self.has_suggested(trial):
+                    self.register(trial)
+                    trials.append(trial)
+
+        return trials
+
+    def _reevaluate(self, num):
+        """Suggest up to `num` candidates again, with the next value of the seed dimension"""
+        trials = []
+        while self._reevaluations and len(trials) < num:
+            key = self._reevaluations.popleft()
+            if key in self._told:
+                continue
+
+            data = numpy.frombuffer(key)[None]
+            trial = self._to_trials(data, repeat=self._evaluations.count(key))[0]
+            if not self.has_suggested(trial):
+                self.register(trial)
+                trials.append(trial)
+
+        return trials
 
     def suggest(self, num):
         """Suggest a `num`ber of new sets of parameters.
 
-        TODO: document how suggest work for this algo
+        Trials promoted to a higher budget by successive halving are suggested first, followed by
+        the candidates evaluated again if ``repeats`` is more than 1, the trials of the initial
+        design and the trials prefetched at the end of the last ``observe``. Candidates are then
+        asked to the nevergrad optimizer in batches covering all the trials still missing, or
+        ``oversampling`` times more, so that population-based optimizers can produce a whole
+        generation at once. Candidates that map to a trial already suggested are not returned.
+        If nevergrad only proposes such duplicates, the missing trials are sampled at random, or
+        enumerated from the grid of discrete spaces smaller than ``ENUMERATION_MAX_SIZE``. Once
+        the enumeration started, or ``ENUMERATION_FRACTION`` of such a grid was suggested, the
+        rest of the grid is enumerated without asking nevergrad.
+        Sequential nevergrad optimizers will only provide a new candidate once the previous one
+        is observed, or told a lie if ``lie_strategy`` is set, which is done within the batch.
 
         Parameters
         ----------
@@ -82,21 +1247,101 @@ class NevergradOptimizer(BaseAlgorithm):
         New parameters must be compliant with the problem's domain `orion.algo.space.Space`.
 
         """
-        # TODO: Adapt this to your algo
-        trials = []
-        while len(trials) < num and not self.is_done:
-            seed = tuple(self.rng.randint(0, 1000000, size=3))
-            new_trial = self.format_trial(self.space.sample(1, seed=seed)[0])
-            if not self.has_suggested(new_trial):
-                self.register(new_trial)
-                trials.append(new_trial)
+        self._materialize()
+        if self._tell_buffer.is_due(self.tell_batch_size, self.tell_interval) or (
+            self._tell_buffer and not self._num_available(1)
+        ):
+            self._flush_tells()
+        self._tell_lies()
+
+        if self._surrogate is not None:
+            self._surrogate.fit(SURROGATE_FIT_TIME)
+
+        trials = self._promote(num, final=self._grid_exhausted())
+        trials.extend(self._reevaluate(num - len(trials)))
+        if self.n_initial_points:
+            trials.extend(self._suggest_initial(num - len(trials)))
+        trials.extend(self._pop_prefetched(num - len(trials)))
+        attempts = 0
+        max_attempts = num * self.oversampling + 100
+        # Once most of a small discrete space was suggested, nevergrad mostly proposes
+        # duplicates and the rest of the grid is enumerated directly.
+        if (
+            self._grid_size is not None
+            and not self.is_done
+            and (
+                self._grid is not None
+                or len(self._pending) + len(self._told)
+                >= ENUMERATION_FRACTION * self._grid_size
+            )
+        ):
+            attempts = max_attempts
+        while len(trials) < num and attempts < max_attempts:
+            missing = num - len(trials)
+            batch_size = self._num_available(
+                min(missing * self.oversampling, max_attempts - attempts)
+            )
+            # Sequential optimizers wait for the candidates just asked, lie to them and go on.
+            if not batch_size and self.lie_strategy is not None:
+                self._tell_lies()
+                batch_size = self._num_available(
+                    min(missing * self.oversampling, max_attempts - attempts)
+                )
+            if not batch_size:
+                break
+            attempts += batch_size
+            trials.extend(self._ask(batch_size, keep=missing))
+
+        # Nevergrad only proposes duplicates, fall back to enumerating small discrete spaces
+        # or to random sampling.
+        if len(trials) < num and attempts >= max_attempts:
+            if self._grid_size is not None:
+                trials.extend(self._enumerate(num - len(trials)))
+            else:
+                trials.extend(self._sample(num - len(trials)))
+
+        # The whole grid of the space was enumerated and no trial can be promoted or evaluated
+        # again, there is nothing left to explore. Other empty batches are retried on the next
+        # call.
+        if num > 0 and self._grid_exhausted() and not self._has_work_left():
+            self._is_done = True
 
         return trials
 
+    def _grid_exhausted(self):
+        """Whether the whole grid of an enumerated space was suggested"""
+        return self._grid is not None and self._grid[2] >= self._grid_size
+
+    @property
+    def _n_pending(self):
+        """Number of trials suggested that are neither completed nor broken"""
+        return self.n_suggested - self._n_observed - self._n_broken
+
+    def _has_work_left(self):
+        """Whether trials suggested may still be promoted to a higher budget or evaluated again.
+
+        The results of the pending trials may lead to promotions or evaluations.
+        """
+        if self._halving is None and self._evaluations is None:
+            return False
+        if self._reevaluations or self._n_pending:
+            return True
+        return self._halving is not None and self._halving.can_promote(final=True)
+
     def observe(self, trials):
         """Observe the `trials` new state of result.
 
-        TODO: document how observe work for this algo
+        The objectives of completed trials are told to nevergrad, using the candidates they were
+        suggested from, in batches of ``tell_batch_size``. These are found in a hash index keyed
+        on the quantized params of the trials, so matching a trial costs O(1) regardless of the
+        number of pending trials. Completed trials that were not suggested by the algorithm, or
+        that were sampled at random, are told as new candidates. If ``repeats`` is more than 1,
+        the evaluations of a candidate are aggregated until it is not suggested again, and their
+        mean is told.
+
+        Oríon sends all the trials of the experiment on every call. The ids of the trials already
+        processed are kept, so that the cost of ``observe`` only depends on the number of trials
+        that are new or changed status since the last call.
 
         Parameters
         ----------
@@ -104,11 +1349,239 @@ class NevergradOptimizer(BaseAlgorithm):
            Trials from a `orion.algo.space.Space`.
 
         """
-        # TODO: Adapt this to your algo or remove if base implementation is fine.
-        super(NevergradOptimizer, self).observe(trials)
+        new_trials, completed, broken = self._new_trials(trials)
+        if not new_trials:
+            return
+
+        self._materialize()
+        if broken:
+            self._tell_broken(broken)
+        self._tell_completed(completed)
+
+        super(NevergradOptimizer, self).observe(new_trials)
+
+        if self.prefetch:
+            self._prefetch()
+
+    def _new_trials(self, trials):
+        """Filter out the trials already processed by observe.
+
+        Returns
+        -------
+        tuple of lists (new trials, completed trials, broken trials)
+
+        """
+        if self._observed_ids is None:
+            self._observed_ids, self._registered_ids = _loads(self._trial_ids_blob)
+
+        new_trials = []
+        completed = []
+        broken = []
+        for trial in trials:
+            is_completed = trial.status == "completed" and trial.objective is not None
+            is_broken = trial.status == "broken"
+            processed = (
+                self._observed_ids
+                if is_completed or is_broken
+                else self._registered_ids
+            )
+            if trial.id in processed:
+                continue
+            processed.add(trial.id)
+            self._trial_ids_blob = None
+            new_trials.append(trial)
+            if is_completed:
+                completed.append(trial)
+            elif is_broken:
+                broken.append(trial)
+
+        return new_trials, completed, broken
+
+    def _tell_completed(self, trials):
+        """Tell nevergrad the objectives of newly completed trials.
+
+        Trials are matched to the candidates they were suggested from by the keys of their
+        params. The others are warm-started as candidates that were not asked. The objectives
+        told are added to the Pareto front.
+        """
+        data = self._codec.encode([trial.params for trial in trials])
+        objectives = [self._objectives(trial) for trial in trials]
+        first_objectives = [numpy.ravel(objective)[0] for objective in objectives]
+        if self._evaluations is not None:
+            threshold = self._evaluations.quantile(REEVALUATION_QUANTILE)
+
+        not_asked = {}
+        keys = self._codec.keys(data)
+        for index, (trial, key) in enumerate(zip(trials, keys)):
+            if not self._record_rung(trial, key, first_objectives[index]):
+                continue
+
+            if key in self._told or key in not_asked:
+                continue
+
+            if self._evaluations is not None:
+                objectives[index] = self._aggregate(key, objectives[index], threshold)
+                if objectives[index] is None:
+                    continue
+
+            # Only the objectives told to nevergrad are ranked, so that results at higher
+            # budgets or single noisy evaluations do not compete with them.
+            if self._pareto_front is not None:
+                self._pareto_front.add(numpy.ravel(objectives[index]), trial)
+
+            if not self._tell(key, objectives[index]):
+                not_asked[key] = index
+
+        if self._tell_buffer.is_due(self.tell_batch_size, self.tell_interval):
+            self._flush_tells()
+
+        if self._surrogate is not None:
+            self._surrogate.add(data, keys, first_objectives)
+
+        if not_asked:
+            indices = list(not_asked.values())
+            self._warm_start(
+                list(not_asked),
+                data[indices],
+                [objectives[index] for index in indices],
+            )
+
+    def _record_rung(self, trial, key, objective):
+        """Record the objective of a trial in the rung of successive halving of its budget.
+
+        Returns
+        -------
+        bool
+            False if the trial is at a higher budget than the lowest one. Only the objectives at
+            the lowest budget are told to nevergrad and count as evaluations of the candidate.
+
+        """
+        if self._halving is None:
+            return True
+
+        budget = trial.params[self._codec.fidelity]
+        self._halving.record(budget, key, objective)
+        return budget == self._halving.budgets[0]
+
+    def _tell(self, key, objective):
+        """Buffer the objective of the candidates of a trial, replacing the lies told for them.
+
+        Returns
+        -------
+        bool
+            False if the trial was not asked to nevergrad.
+
+        """
+        candidates = self._pending.pop(key, None) or []
+        if not candidates and key not in self._lied:
+            return False
+
+        for candidate in candidates:
+            self._tell_buffer.append(candidate, objective)
+        for candidate in self._lied.pop(key, []):
+            self._tell_buffer.append(candidate, objective, is_retraction=True)
+        self._record_told(key, objective)
+        return True
+
+    def _aggregate(self, key, objective, threshold):
+        """Add an evaluation of a candidate and return the mean of its evaluations.
+
+        Returns
+        -------
+        None
+            If the candidate is suggested again, because it was evaluated less than ``repeats``
+            times and its mean is below `threshold`.
+
+        """
+        count = self._evaluations.add(key, objective)
+        mean = self._evaluations.mean(key)
+        if count < self.repeats and numpy.ravel(mean)[0] <= threshold:
+            self._reevaluations.append(key)
+            return None
+        return mean
+
+    def _objectives(self, trial):
+        """Objectives of a completed trial, an array of them if there are several"""
+        if not self.objectives:
+            return trial.objective.value
+
+        results = {result.name: result.value for result in trial.results}
+        objectives = [results.get(name, float("inf")) for name in self.objectives]
+        if len(objectives) == 1:
+            return objectives[0]
+        return numpy.array(objectives, dtype=float)
+
+    @property
+    def pareto_front(self):
+        """Non-dominated trials observed, sorted by their first objective.
+
+        Empty unless ``objectives`` is set. The front is updated in `observe`, so this does not
+        go through the trials.
+        """
+        self._materialize()
+        if self._pareto_front is None:
+            return []
+        return list(self._pareto_front.items)
+
+    def register(self, trial):
+        """Save the trial as one suggested or observed by the algorithm.
+
+        The numbers of observed and broken trials, and of pending trials at each budget of
+        successive halving, are updated along, so that `n_observed`, `is_done` and the final
+        promotions do not go through all the trials.
+
+        Parameters
+        ----------
+        trial: ``orion.core.worker.trial.Trial``
+           Trial from a `orion.algo.space.Space`.
+
+        """
+        trial_id = self.get_id(trial)
+        results = get_trial_results(trial) if trial.objective else None
+        previous = self._trials_info.get(trial_id)
+        if previous is not None and previous[1] is not None:
+            self._n_observed -= 1
+        elif previous is not None and previous[0].status == "broken":
+            self._n_broken -= 1
+        if results is not None:
+            self._n_observed += 1
+        elif trial.status == "broken":
+            self._n_broken += 1
+        if self._codec.fidelity is not None:
+            if previous is not None and _is_pending(*previous):
+                self._pending_budgets[previous[0].params[self._codec.fidelity]] -= 1
+            if _is_pending(trial, results):
+                self._pending_budgets[trial.params[self._codec.fidelity]] += 1
+        self._trials_info[trial_id] = (copy.deepcopy(trial), results)
+
+    @property
+    def n_observed(self):
+        """Number of completed trials observed by the algorithm"""
+        return self._n_observed
 
     @property
     def is_done(self):
-        """Return True, if an algorithm holds that there can be no further improvement."""
-        # NOTE: Drop if base implementation is fine.
-        return super(NevergradOptimizer, self).is_done
+        """Return True, if an algorithm holds that there can be no further improvement.
+
+        This is the case once the grid of a small discrete space was enumerated and no trial can
+        be promoted or evaluated again, all the points of a discrete space without fidelity nor
+        repeated evaluations were suggested or ``max_trials`` trials were observed. The counts
+        involved are kept up to date, so this costs O(1).
+        """
+        if self._is_done:
+            return True
+
+        if self._cardinality is None:
+            try:
+                self._cardinality = self.space.cardinality
+            except OverflowError:
+                # Integer dimensions with an unbounded prior have infinitely many values.
+                self._cardinality = float("inf")
+
+        # Trials at other budgets or seeds are not new points of the space.
+        exhausted = (
+            self._halving is None
+            and self._evaluations is None
+            and self.n_suggested >= self._cardinality
+        )
+        return exhausted or self.n_observed >= getattr(self, "max_trials", float("inf"))
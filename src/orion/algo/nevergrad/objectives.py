@@ -0,0 +1,255 @@
+"""
+:mod:`orion.algo.nevergrad.objectives -- Bookkeeping of observed objectives
+===========================================================================
+
+Objectives are buffered before they are told to nevergrad, aggregated over repeated
+evaluations and ranked in a Pareto front.
+"""
+import bisect
+import time
+
+import numpy
+
+
+class TellBuffer:
+    """Array-backed buffer of objectives waiting to be told to nevergrad.
+
+    Parameters
+    ----------
+    capacity: int
+        Initial capacity of the arrays, doubled whenever it is exceeded.
+    num_objectives: int
+        Number of objectives of each candidate. Several objectives are buffered and popped as
+        arrays.
+
+    """
+
+    def __init__(self, capacity=1, num_objectives=1):
+        self.candidates = []
+        self.objectives = numpy.empty(
+            (max(capacity, 1),) + ((num_objectives,) if num_objectives > 1 else ())
+        )
+        self.retractions = numpy.zeros(max(capacity, 1), dtype=bool)
+        # Time at which the oldest objective was buffered.
+        self.since = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def append(self, candidate, objective, is_retraction=False):
+        """Buffer the objective of a candidate, or the replacement of the lie told for it"""
+        size = len(self.candidates)
+        if size == len(self.objectives):
+            self.objectives = numpy.resize(
+                self.objectives, (2 * size,) + self.objectives.shape[1:]
+            )
+            self.retractions = numpy.resize(self.retractions, 2 * size)
+        if not size:
+            self.since = time.time()
+        self.candidates.append(candidate)
+        self.objectives[size] = objective
+        self.retractions[size] = is_retraction
+
+    def is_due(self, size, interval=None):
+        """Whether the buffer holds `size` objectives or its oldest is `interval` seconds old"""
+        if not self.candidates:
+            return False
+        return len(self.candidates) >= size or (
+            interval is not None and time.time() - self.since >= interval
+        )
+
+    def pop(self):
+        """Empty the buffer.
+
+        Returns
+        -------
+        list of tuples (candidate, objective, is_retraction)
+
+        """
+        size = len(self.candidates)
+        entries = list(
+            zip(
+                self.candidates,
+                (
+                    list(self.objectives[:size].copy())
+                    if self.objectives.ndim > 1
+                    else self.objectives[:size].tolist()
+                ),
+                self.retractions[:size].tolist(),
+            )
+        )
+        self.candidates = []
+        self.since = None
+        return entries
+
+
+class RunningStats:
+    """Running mean and variance of the objectives of repeated evaluations.
+
+    The statistics are updated with Welford's algorithm and stored in arrays indexed by a slot
+    assigned to each key, doubled whenever their capacity is exceeded.
+
+    Parameters
+    ----------
+    num_objectives: int
+        Number of objectives of each evaluation.
+
+    """
+
+    def __init__(self, num_objectives=1):
+        self.slots = {}
+        shape = (num_objectives,) if num_objectives > 1 else ()
+        self.counts = numpy.zeros(16, dtype=numpy.int64)
+        self.means = numpy.zeros((16,) + shape)
+        self.squares = numpy.zeros((16,) + shape)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def add(self, key, objective):
+        """Add an evaluation of a key and return the number of evaluations of the key"""
+        slot = self.slots.setdefault(key, len(self.slots))
+        if slot == len(self.counts):
+            self.counts = numpy.resize(self.counts, 2 * slot)
+            self.counts[slot:] = 0
+            for name in ("means", "squares"):
+                values = getattr(self, name)
+                values = numpy.resize(values, (2 * slot,) + values.shape[1:])
+                values[slot:] = 0
+                setattr(self, name, values)
+
+        count = self.counts[slot] + 1
+        delta = objective - self.means[slot]
+        self.means[slot] += delta / count
+        self.squares[slot] += delta * (objective - self.means[slot])
+        self.counts[slot] = count
+        return int(count)
+
+    def count(self, key):
+        """Number of evaluations of a key"""
+        slot = self.slots.get(key)
+        return 0 if slot is None else int(self.counts[slot])
+
+    def mean(self, key):
+        """Mean objective of the evaluations of a key"""
+        mean = self.means[self.slots[key]]
+        return mean.copy() if mean.ndim else float(mean)
+
+    def variance(self, key):
+        """Sample variance of the objective of the evaluations of a key, 0 for a single one"""
+        slot = self.slots[key]
+        variance = self.squares[slot] / max(self.counts[slot] - 1, 1)
+        return variance if variance.ndim else float(variance)
+
+    def quantile(self, fraction):
+        """Quantile `fraction` of the mean of the first objective over the keys, infinite if there
+        is none"""
+        if not self.slots:
+            return float("inf")
+        means = self.means[: len(self.slots)].reshape(len(self.slots), -1)
+        return float(numpy.quantile(means[:, 0], fraction))
+
+
+class ObjectiveSummary:
+    """Count, sum, minimum and maximum of objectives, updated incrementally.
+
+    Objectives with infinite or undefined values are ignored. Several objectives are summarized
+    separately.
+
+    Parameters
+    ----------
+    num_objectives: int
+        Number of objectives of each candidate.
+
+    """
+
+    def __init__(self, num_objectives=1):
+        shape = (num_objectives,) if num_objectives > 1 else ()
+        self.count = 0
+        self.total = numpy.zeros(shape)
+        self.minimum = numpy.full(shape, numpy.inf)
+        self.maximum = numpy.full(shape, -numpy.inf)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, objective):
+        """Add an objective, unless some of its values are not finite"""
+        objective = numpy.asarray(objective, dtype=float)
+        if not numpy.isfinite(objective).all():
+            return
+        self.count += 1
+        self.total = self.total + objective
+        self.minimum = numpy.minimum(self.minimum, objective)
+        self.maximum = numpy.maximum(self.maximum, objective)
+
+    def mean(self):
+        """Mean of the objectives added"""
+        return _unwrap(self.total / self.count)
+
+    def min(self):
+        """Minimum of the objectives added"""
+        return _unwrap(self.minimum)
+
+    def max(self):
+        """Maximum of the objectives added"""
+        return _unwrap(self.maximum)
+
+
+def _unwrap(values):
+    """Return a float for a single objective, a copy of the array for several"""
+    return values.copy() if values.ndim else float(values)
+
+
+class ParetoFront:
+    """Pareto front of minimized objectives, updated incrementally.
+
+    The front is kept sorted by the first objective. With two objectives, the second one is then
+    strictly decreasing along the front, so that a point is dominated if and only if its
+    predecessor has a lower second objective, and the points it dominates are contiguous after
+    it. Both are found with a binary search. With more objectives, a new point is compared to
+    the points of the front only, never to all the points added.
+
+    """
+
+    def __init__(self):
+        self.objectives = []
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, objectives, item):
+        """Add an item with its objectives.
+
+        Returns
+        -------
+        bool
+            True if the item is on the front, False if it is dominated by a point of the front,
+            or has the same objectives.
+
+        """
+        objectives = tuple(float(objective) for objective in objectives)
+        index = bisect.bisect_right(self.objectives, objectives)
+        if len(objectives) == 2:
+            if index and self.objectives[index - 1][1] <= objectives[1]:
+                return False
+            end = index
+            while (
+                end < len(self.objectives) and self.objectives[end][1] >= objectives[1]
+            ):
+                end += 1
+            dominated = range(index, end)
+        else:
+            front = numpy.array(self.objectives).reshape(-1, len(objectives))
+            if (front[:index] <= objectives).all(axis=1).any():
+                return False
+            dominated = numpy.flatnonzero((front[index:] >= objectives).all(axis=1))
+            dominated += index
+
+        for position in reversed(dominated):
+            del self.objectives[position]
+            del self.items[position]
+        self.objectives.insert(index, objectives)
+        self.items.insert(index, item)
+        return True
@@ -0,0 +1,317 @@
+"""
+:mod:`orion.algo.nevergrad.portfolio -- Portfolios of nevergrad optimizers
+==========================================================================
+
+Several nevergrad optimizers are raced against each other, and candidates are allocated to
+the ones with the best recent improvements.
+"""
+import atexit
+import concurrent.futures
+import logging
+import pickle
+import time
+
+import nevergrad as ng
+import numpy
+
+logger = logging.getLogger(__name__)
+
+#: Factor by which the scores of the optimizers of a portfolio decay at each observed result.
+PORTFOLIO_DECAY = 0.9
+
+#: Minimum score of the optimizers of a portfolio, so that none is starved of candidates.
+PORTFOLIO_MIN_SCORE = 0.1
+
+# Process pools running the steps of portfolios, indexed by their number of processes.
+_executors = {}
+
+
+def is_sequential(optimizer):
+    """Whether a nevergrad optimizer cannot be asked again before the last candidate is told"""
+    return optimizer.no_parallelization or getattr(
+        getattr(optimizer, "optim", None), "no_parallelization", False
+    )
+
+
+def capacity(optimizer, num, num_queued=0):
+    """Number of candidates, up to `num`, that can be asked to a nevergrad optimizer right now.
+
+    `num_queued` is the number of tells of asked candidates not applied to the optimizer yet.
+    """
+    if not is_sequential(optimizer):
+        return num
+    return int(
+        optimizer.num_ask
+        <= optimizer.num_tell + num_queued - optimizer.num_tell_not_asked
+    )
+
+
+def tell_if_supported(optimizer, candidate, objective):
+    """Tell the objective of a candidate to a nevergrad optimizer, if it supports it.
+
+    Candidates that were not asked, or were already told, are told as points not asked. Some
+    optimizers do not support it and raise ``TellNotAskedNotSupportedError``, in which case the
+    tell is skipped.
+
+    Returns
+    -------
+    bool
+        False if the tell was skipped.
+
+    """
+    try:
+        optimizer.tell(candidate, objective)
+    except ng.errors.TellNotAskedNotSupportedError:
+        logger.debug(
+            "Optimizer %s cannot be told points it did not ask, skipping the tell",
+            optimizer.name,
+        )
+        return False
+    return True
+
+
+def replace_lie(optimizer, candidate, objective=None):
+    """Replace the lie told to a nevergrad optimizer for a candidate by its actual objective.
+
+    Nevergrad cannot forget a tell. The lie is removed from the archive of the optimizer,
+    which is used for its recommendations, and the actual objective is told again for the
+    same candidate. If `objective` is None, the lie is only removed. Optimizers that cannot be
+    told points not asked keep the lie in their internal state, see `tell_if_supported`.
+    """
+    data = candidate.get_standardized_data(reference=optimizer.parametrization)
+    lie = optimizer.archive.bytesdict.pop(numpy.asarray(data).tobytes(), None)
+    if objective is not None:
+        tell_if_supported(optimizer, candidate, objective)
+    for name, best in optimizer.current_bests.items():
+        if best is not lie:
+            continue
+        if optimizer.archive.bytesdict:
+            optimizer.current_bests[name] = min(
+                optimizer.archive.values(),
+                key=lambda value, n=name: value.get_estimation(n),
+            )
+        else:
+            optimizer.current_bests[name] = ng.optimization.utils.MultiValue(
+                optimizer.parametrization,
+                numpy.inf,
+                reference=optimizer.parametrization,
+            )
+
+
+def _step(optimizer, tells, num):
+    """Apply queued tells to a nevergrad optimizer and ask it `num` candidates"""
+    for candidate, objective, is_retraction, _ in tells:
+        if is_retraction:
+            replace_lie(optimizer, candidate, objective)
+        else:
+            tell_if_supported(optimizer, candidate, objective)
+
+    return optimizer, [optimizer.ask() for _ in range(num)]
+
+
+def _run_step(payload):
+    """Run `_step` in a worker process, on arguments and results pickled together.
+
+    Pickling the optimizer along with the candidates preserves the references between them.
+    The duration of the step is returned along, to measure the overhead of the transfers.
+    """
+    args = pickle.loads(payload)
+    start = time.perf_counter()
+    optimizer, candidates = _step(*args)
+    duration = time.perf_counter() - start
+    return pickle.dumps(
+        (optimizer, candidates, duration), protocol=pickle.HIGHEST_PROTOCOL
+    )
+
+
+def _get_executor(n_jobs):
+    """Return a process pool of `n_jobs` processes, shared by all portfolios"""
+    if n_jobs not in _executors:
+        _executors[n_jobs] = concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs)
+    return _executors[n_jobs]
+
+
+@atexit.register
+def _shutdown_executors():
+    """Shut down the process pools of the portfolios"""
+    for executor in _executors.values():
+        executor.shutdown()
+    _executors.clear()
+
+
+class OptimizerPortfolio:
+    """Portfolio of nevergrad optimizers raced against each other.
+
+    Batches of candidates are split between the optimizers in proportion to their score. The
+    score of an optimizer decays by ``PORTFOLIO_DECAY`` at each observed result and is
+    increased by one each time one of its candidates improves the best objective, so that
+    candidates move to the optimizers with the best recent improvements.
+
+    The tells are queued and applied by each optimizer right before it is asked new
+    candidates. These steps of the optimizers run in a process pool when ``n_jobs`` is greater
+    than 1, so that the internal computations of optimizers like CMA or DE in high dimension
+    do not serialize on one core. The optimizers and their candidates go back and forth to the
+    worker processes pickled together, since the state of the algorithm pickles all the
+    optimizers after each ``suggest`` and ``observe`` anyway, and worker processes keeping them
+    would have to send them back as often. With nevergrad 1.0, these transfers cost about 5 to
+    15 ms per optimizer for ``CMA`` or ``TwoPointsDE`` in dimension 10 to 1000, for steps
+    telling and asking a generation of 50 candidates taking 10 to 30 ms. Processes only pay off
+    for longer steps, so the wall time and the computation time of the steps are logged at
+    DEBUG level to check it.
+
+    Parameters
+    ----------
+    optimizers: list of nevergrad optimizers
+        Optimizers of the portfolio, each with its own parametrization.
+    n_jobs: int
+        Number of processes used to run the steps of the optimizers.
+
+    """
+
+    def __init__(self, optimizers, n_jobs=1):
+        self.optimizers = list(optimizers)
+        self.n_jobs = n_jobs
+        self.scores = numpy.ones(len(self.optimizers))
+        self.best = float("inf")
+        # Tells not applied yet to each optimizer, with whether they are the last ones of their
+        # candidates.
+        self._tells = [[] for _ in self.optimizers]
+        # Index of the optimizer that asked each candidate, indexed by candidate uids. Entries
+        # are removed once the last tell of the candidate was applied.
+        self._owners = {}
+
+    @property
+    def parametrization(self):
+        """Parametrization of the first optimizer, used to create candidates not asked"""
+        return self.optimizers[0].parametrization
+
+    def enable_pickling(self):
+        """Make all the optimizers picklable"""
+        for optimizer in self.optimizers:
+            optimizer.enable_pickling()
+
+    def _capacities(self, num):
+        return numpy.array(
+            [
+                capacity(
+                    optimizer,
+                    num,
+                    sum(
+                        not is_retraction and candidate.uid in self._owners
+                        for candidate, _, is_retraction, _ in tells
+                    ),
+                )
+                for optimizer, tells in zip(self.optimizers, self._tells)
+            ]
+        )
+
+    def num_available(self, num):
+        """Number of candidates, up to `num`, that can be asked to the portfolio right now"""
+        return min(num, int(self._capacities(num).sum()))
+
+    def allocate(self, num):
+        """Split `num` candidates between the optimizers in proportion to their score.
+
+        Returns
+        -------
+        ``numpy.ndarray`` of int
+            Number of candidates to ask to each optimizer.
+
+        """
+        capacities = self._capacities(num)
+        weights = self.scores * (capacities > 0)
+        if not num or not weights.sum():
+            return numpy.zeros(len(self.optimizers), dtype=int)
+
+        shares = num * weights / weights.sum()
+        counts = numpy.floor(shares).astype(int)
+        # The remaining candidates go to the largest fractional shares.
+        counts[numpy.argsort(counts - shares)[: num - counts.sum()]] += 1
+        return numpy.minimum(counts, capacities)
+
+    def ask_batch(self, num):
+        """Ask `num` candidates to the optimizers of the portfolio.
+
+        Returns
+        -------
+        list of ``nevergrad.p.Parameter``
+
+        """
+        steps = [
+            (index, (self.optimizers[index], self._tells[index], int(count)))
+            for index, count in enumerate(self.allocate(num))
+            if count
+        ]
+        if self.n_jobs > 1 and len(steps) > 1:
+            start = time.perf_counter()
+            payloads = [
+                pickle.dumps(args, protocol=pickle.HIGHEST_PROTOCOL)
+                for _, args in steps
+            ]
+            results = [
+                pickle.loads(result)
+                for result in _get_executor(self.n_jobs).map(_run_step, payloads)
+            ]
+            logger.debug(
+                "Ran %d steps of the portfolio in %.3fs for %.3fs of computation",
+                len(steps),
+                time.perf_counter() - start,
+                sum(duration for _, _, duration in results),
+            )
+            results = [(optimizer, candidates) for optimizer, candidates, _ in results]
+        else:
+            results = [_step(*args) for _, args in steps]
+
+        candidates = []
+        for (index, (_, tells, _)), (optimizer, new_candidates) in zip(steps, results):
+            self.optimizers[index] = optimizer
+            self._tells[index] = []
+            for candidate, _, _, is_final in tells:
+                if is_final:
+                    self._owners.pop(candidate.uid, None)
+            for candidate in new_candidates:
+                self._owners[candidate.uid] = index
+            candidates.extend(new_candidates)
+
+        return candidates
+
+    def tell(self, candidate, objective):
+        """Queue the objective of a candidate for the optimizer that asked it.
+
+        Candidates not asked by any of the optimizers are told to all of them.
+        """
+        self._queue(candidate, objective, is_retraction=False)
+
+    def tell_lie(self, candidate, objective):
+        """Queue a lie told for a candidate, to be replaced with `replace_lie`"""
+        self._queue(candidate, objective, is_retraction=False, is_final=False)
+
+    def forget(self, candidates):
+        """Forget the optimizers that asked candidates which will never be told"""
+        for candidate in candidates:
+            self._owners.pop(candidate.uid, None)
+
+    def replace_lie(self, candidate, objective):
+        """Queue the replacement of the lie told for a candidate by its actual objective.
+
+        The lie is only forgotten if `objective` is None.
+        """
+        self._queue(candidate, objective, is_retraction=True)
+
+    def _queue(self, candidate, objective, is_retraction, is_final=True):
+        owner = self._owners.get(candidate.uid)
+        if owner is None:
+            for tells in self._tells:
+                tells.append((candidate, objective, is_retraction, is_final))
+        else:
+            self._tells[owner].append((candidate, objective, is_retraction, is_final))
+        if objective is None:
+            return
+
+        self.scores = numpy.maximum(self.scores * PORTFOLIO_DECAY, PORTFOLIO_MIN_SCORE)
+        # Improvements of the first objective are credited when there are several.
+        objective = numpy.ravel(objective)[0]
+        if objective < self.best:
+            if owner is not None:
+                self.scores[owner] += 1
+            self.best = objective
@@ -0,0 +1,90 @@
+"""Perform tests for `orion.algo.nevergrad.codec`."""
+import numpy
+import pytest
+from orion.core.io.space_builder import SpaceBuilder
+
+from orion.algo.nevergrad.codec import SpaceCodec
+
+
+def test_space_codec_round_trip():
+    """Test that the codec encodes and decodes batches of parameters"""
+    space = SpaceBuilder().build(
+        {
+            "a": "uniform(0, 1)",
+            "b": "uniform(0, 10, discrete=True)",
+            "c": "loguniform(1, 100)",
+            "d": "choices(['x', 0.2, None])",
+            "e": "uniform(0, 5, shape=(3, 2))",
+            "f": "fidelity(1, 10, base=2)",
+        }
+    )
+    codec = SpaceCodec(space)
+    assert codec.size == 1 + 1 + 1 + 1 + 6
+    assert codec.fidelity == "f"
+
+    params = [dict(trial.params) for trial in space.sample(5, seed=1)]
+    data = codec.encode(params)
+    assert data.shape == (5, codec.size)
+
+    values = codec.decode(data)
+    for point, value in zip(params, values):
+        assert set(value) == {"a", "b", "c", "d", "e"}
+        assert value["a"] == point["a"]
+        assert value["b"] == point["b"]
+        assert value["d"] == point["d"]
+        numpy.testing.assert_allclose(value["e"], point["e"])
+
+    keys = codec.keys(data)
+    assert len(set(keys)) == 5
+    assert codec.keys(data * (1 + 1e-14)) == keys
+    assert codec.keys(numpy.zeros((1, codec.size))) == codec.keys(
+        -numpy.zeros((1, codec.size))
+    )
+
+    # Out of bound values are clipped and integers rounded
+    data[:, 0] = 2
+    data[:, 1] = 3.4
+    assert {(value["a"], value["b"]) for value in codec.decode(data)} == {(1.0, 3)}
+
+
+def test_codec_parametrization():
+    """Test that real and integer columns are compiled in a single nevergrad array"""
+    space = SpaceBuilder().build(
+        {
+            "a": "uniform(0, 1)",
+            "b": "uniform(0, 10, discrete=True)",
+            "c": "loguniform(1, 100)",
+            "d": "choices(['x', 0.2, None])",
+            "e": "uniform(0, 5, shape=(3, 2))",
+            "g": "normal(0, 1)",
+        }
+    )
+    codec = SpaceCodec(space)
+    assert set(codec.parametrization) == {"unit", "choice3"}
+    assert codec.parametrization["unit"].value.shape == (10,)
+    assert codec.grid_shape is None
+
+    data = codec.encode([dict(trial.params) for trial in space.sample(5, seed=1)])
+    numpy.testing.assert_allclose(codec.from_values(codec.to_values(data)), data)
+
+    candidate = codec.parametrization.spawn_child()
+    candidate.value = {"unit": numpy.full(10, 0.5), "choice3": 2}
+    (point,) = codec.decode(codec.from_values([candidate.value]))
+    assert point["b"] == 5
+    assert point["c"] == pytest.approx(10)
+    assert point["d"] is None
+    assert point["g"] == 0
+
+
+def test_codec_prior_arguments():
+    """Test that priors are mapped to the unit interval with their arguments"""
+    space = SpaceBuilder().build({"a": "normal(100, 2)", "b": "gamma(2, 1)"})
+    codec = SpaceCodec(space)
+    data = codec.encode([dict(trial.params) for trial in space.sample(5, seed=1)])
+    numpy.testing.assert_allclose(codec.from_values(codec.to_values(data)), data)
+
+    candidate = codec.parametrization.spawn_child()
+    candidate.value = {"unit": numpy.full(2, 0.5)}
+    (point,) = codec.decode(codec.from_values([candidate.value]))
+    assert point["a"] == pytest.approx(100)
+    assert point["b"] == pytest.approx(1 + 1.678, abs=1e-3)
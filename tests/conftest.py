@@ -3,3 +3,39 @@
 import pytest
 
 pytest.register_assert_rewrite("orion.testing")
+
+# The helpers of Oríon are imported once their assertions are set to be rewritten.
+from orion.testing.algo import BaseAlgoTests  # pylint: disable=wrong-import-position
+
+
+class NevergradAlgoTests(BaseAlgoTests):
+    """Helpers of the test suite of Oríon to create and drive NevergradOptimizer"""
+
+    algo_name = "nevergradoptimizer"
+    config = {
+        "seed": 1234,  # Because this is so random
+        "model_name": "TwoPointsDE",
+        "budget": 100,
+        "num_workers": 10,
+        "lie_strategy": None,
+        "n_jobs": 1,
+        "prefetch": 0,
+        "tell_batch_size": 1,
+        "tell_interval": None,
+        "n_initial_points": 0,
+        "initial_design": "LHSSearch",
+        "epsilon": None,
+        "oversampling": 1,
+        "surrogate": None,
+        "constraints": None,
+        "objectives": None,
+        "repeats": 1,
+        "seed_dimension": None,
+        # Add other arguments for your algorithm to pass test_configuration
+    }
+
+
+@pytest.fixture
+def algo_tests():
+    """Helpers to create NevergradOptimizer algorithms and make them observe trials"""
+    return NevergradAlgoTests()
@@ -0,0 +1,152 @@
+"""Perform tests for `orion.algo.nevergrad.halving`."""
+# pylint: disable=protected-access
+import pytest
+from orion.algo.space import Fidelity
+from orion.core.io.space_builder import SpaceBuilder
+from orion.core.utils import backward
+
+from orion.algo.nevergrad.halving import SuccessiveHalving, fidelity_budgets
+
+
+def test_fidelity_budgets():
+    """Test that budgets are spaced geometrically between the bounds of the fidelity"""
+    space = SpaceBuilder().build(
+        {
+            "a": "fidelity(1, 10, base=2)",
+            "b": "fidelity(1, 27, base=3)",
+            "c": "fidelity(1, 1000, base=10)",
+            "d": "fidelity(1, 243, base=3)",
+        }
+    )
+    assert fidelity_budgets(space["a"]) == [1, 2, 5, 10]
+    assert fidelity_budgets(space["b"]) == [1, 3, 9, 27]
+    assert fidelity_budgets(space["c"]) == [1, 10, 100, 1000]
+    assert fidelity_budgets(space["d"]) == [1, 3, 9, 27, 81, 243]
+
+
+@pytest.mark.parametrize(
+    "low,high,expected",
+    [(1.5, 12.0, [1.5, 3, 6, 12]), (0.05, 0.8, [0.05, 0.1, 0.2, 0.4, 0.8])],
+)
+def test_fidelity_budgets_float(low, high, expected):
+    """Test that budgets of real fidelities end exactly at the bounds"""
+    dim = Fidelity("epoch", 1, 2, base=2)
+    # Some versions of Oríon truncate the bounds of fidelities to integers.
+    dim.low, dim.high = low, high
+    budgets = fidelity_budgets(dim)
+    assert budgets == pytest.approx(expected)
+    assert budgets[0] == low
+    assert budgets[-1] == high
+
+
+def test_successive_halving():
+    """Test that the best trials of a rung are promoted once"""
+    space = SpaceBuilder().build({"a": "fidelity(1, 9, base=3)"})
+    halving = SuccessiveHalving(space["a"])
+    assert halving.budgets == [1, 3, 9]
+
+    for key, objective in enumerate([5.0, 1.0, 3.0, 4.0, 2.0, 0.0, 6.0]):
+        halving.record(1, key, objective)
+    halving.record(1, 1, -1.0)
+    halving.record(2, 0, -1.0)
+    assert halving.best(0) == [5, 1]
+    assert halving.best(1) == []
+
+    halving.promoted[0].add(5)
+    assert halving.best(0) == [1]
+
+    halving.record(3, 0, -1.0)
+    assert halving.best(1) == []
+    assert halving.best(1, final=True) == [0]
+    assert halving.can_promote(final=True)
+    halving.promoted[0].add(1)
+    halving.promoted[1].add(0)
+    assert not halving.can_promote(final=True)
+
+
+def test_final_rung():
+    """Test that rungs are only final once the lower ones cannot get more results"""
+    space = SpaceBuilder().build({"a": "fidelity(1, 9, base=3)"})
+    halving = SuccessiveHalving(space["a"])
+    assert halving.final_rung() is None
+
+    for key, objective in enumerate([5.0, 1.0, 3.0, 4.0, 2.0, 0.0]):
+        halving.record(1, key, objective)
+    assert halving.final_rung() is None
+    halving.promoted[0].update([5, 1])
+    halving.record(3, 1, 1.0)
+    assert halving.final_rung(pending=[3]) is None
+    assert halving.final_rung(pending=[9]) == 1
+    assert halving.final_rung() == 1
+
+    halving.promoted[1].add(1)
+    assert halving.final_rung() is None
+
+
+def test_fidelity_halving(algo_tests):
+    """Test that the best trials are promoted to the budgets of the next rungs"""
+    space = algo_tests.create_space(
+        algo_tests.update_space({"f": "fidelity(1, 9, base=3)"})
+    )
+    algo = algo_tests.create_algo(space=space)
+    trials = algo.suggest(9)
+    assert {trial.params["f"] for trial in trials} == {1}
+
+    objectives = [dict(objective=(i * 4) % 9) for i in range(9)]
+    backward.algo_observe(algo, trials, objectives)
+    assert algo.algorithm.algo.num_tell == 9
+
+    promoted = algo.suggest(4)
+    assert [trial.params["f"] for trial in promoted[:3]] == [3, 3, 3]
+    assert promoted[3].params["f"] == 1
+    assert [trial.params["x"] for trial in promoted[:3]] == [
+        trials[i].params["x"] for i in (0, 7, 5)
+    ]
+
+    backward.algo_observe(algo, promoted[:3], [dict(objective=i) for i in range(3)])
+    assert algo.algorithm.algo.num_tell == 9
+    assert algo.suggest(1)[0].params == dict(promoted[0].params, f=9)
+
+
+def test_repeats_fidelity(algo_tests):
+    """Test that results at higher budgets are not counted as repeated evaluations"""
+    space = algo_tests.create_space(
+        algo_tests.update_space(
+            {
+                "seed": "uniform(0, 10, discrete=True)",
+                "f": "fidelity(1, 9, base=3)",
+            }
+        )
+    )
+    algo = algo_tests.create_algo(space=space, repeats=3, seed_dimension="seed")
+    trials = algo.suggest(3)
+    backward.algo_observe(algo, trials, [dict(objective=i) for i in range(3)])
+    promoted = algo.suggest(1)[0]
+    assert promoted.params == dict(trials[0].params, f=3)
+
+    backward.algo_observe(algo, [promoted], [dict(objective=100)])
+    key = algo.algorithm._codec.keys(algo.algorithm._codec.encode([promoted.params]))[0]
+    assert algo.algorithm._evaluations.count(key) == 1
+    assert algo.algorithm._evaluations.mean(key) == 0
+    assert key not in algo.algorithm._told
+
+
+def test_enumeration_fidelity(algo_tests):
+    """Test that enumerated spaces are only done once trials reached the highest budget"""
+    space = algo_tests.create_space(
+        {"x": "uniform(0, 5, discrete=True)", "f": "fidelity(1, 9, base=3)"}
+    )
+    algo = algo_tests.create_algo(space=space)
+    budgets = []
+    for _ in range(20):
+        if algo.is_done:
+            break
+        trials = algo.suggest(2)
+        budgets += [trial.params["f"] for trial in trials]
+        backward.algo_observe(
+            algo, trials, [dict(objective=trial.params["x"]) for trial in trials]
+        )
+    assert algo.is_done
+    assert budgets.count(1) == 6
+    assert budgets.count(3) == 2
+    assert budgets.count(9) == 1
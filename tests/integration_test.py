@@ -1,23 +1,617 @@
 """Perform integration tests for `orion.algo.nevergrad`."""
-from orion.testing.algo import BaseAlgoTests
+# pylint: disable=protected-access
+import logging
+import pickle
+import time
+import zlib
+
+import nevergrad as ng
+import numpy
+import pytest
+from conftest import NevergradAlgoTests
+from orion.core.utils import backward
+
+from orion.algo.nevergrad.nevergradoptimizer import resolve_optimizer
+from orion.algo.nevergrad.portfolio import OptimizerPortfolio
+
+
+def _x_above_tenth(params):
+    return params["x"] >= 0.1
 
 
 # Test suite for algorithms. You may reimplement some of the tests to adapt them to your algorithm
 # Full documentation is available at https://orion.readthedocs.io/en/stable/code/testing/algo.html
 # Look for algorithms tests in https://github.com/Epistimio/orion/blob/master/tests/unittests/algo
 # for examples of customized tests.
-class TestNevergradOptimizer(BaseAlgoTests):
+class TestNevergradOptimizer(
+    NevergradAlgoTests
+):  # pylint: disable=too-many-public-methods
     """Test suite for algorithm NevergradOptimizer"""
 
-    algo_name = "nevergradoptimizer"
-    config = {
-        "seed": 1234,  # Because this is so random
-        # Add other arguments for your algorithm to pass test_configuration
-    }
+    def test_suggest_batch(self, mocker):
+        """Test that suggest asks all candidates in a single batch"""
+        algo = self.create_algo()
+        spy = mocker.spy(algo.algorithm, "_ask")
+        trials = algo.suggest(8)
+        assert len(trials) == 8
+        assert spy.call_count == 1
+        assert spy.call_args[0] == (8,)
+        assert algo.algorithm.algo.num_workers == 10
+
+    def test_pending_index(self):
+        """Test that observed trials are matched with their pending candidates"""
+        algo = self.create_algo()
+        trials = algo.suggest(4)
+        assert len(algo.algorithm._pending) == 4
+
+        # Lossy round trips of the params still map to the pending candidates
+        for trial in trials:
+            for param in trial._params:
+                param.value *= 1 + 1e-14
+
+        backward.algo_observe(algo, trials[:3], [dict(objective=i) for i in range(3)])
+        assert len(algo.algorithm._pending) == 1
+        assert len(algo.algorithm._told) == 3
+        assert algo.algorithm.algo.num_tell_not_asked == 0
+
+    def test_lie_strategy(self):
+        """Test that pending trials are told lies which are retracted once observed"""
+        algo = self.create_algo(lie_strategy="max")
+        nevergrad = algo.algorithm.algo
+        trials = algo.suggest(4)
+        backward.algo_observe(algo, trials[:2], [dict(objective=1), dict(objective=3)])
+
+        # Lies are only told when there are objectives to compute them from
+        algo.suggest(1)
+        assert nevergrad.num_tell == 2 + 2
+        assert len(algo.algorithm._lied) == 2
+        means = sorted(value.mean for value in nevergrad.archive.values())
+        assert means == [1, 3, 3, 3]
+
+        backward.algo_observe(algo, trials[2:3], [dict(objective=0)])
+        assert len(algo.algorithm._lied) == 1
+        assert sorted(value.mean for value in nevergrad.archive.values()) == [
+            0,
+            1,
+            3,
+            3,
+        ]
+        assert nevergrad.current_bests["pessimistic"].mean == 0
+
+    def test_sequential_lie(self):
+        """Test that sequential optimizers are told lies within a batch of suggestions"""
+        algo = self.create_algo(model_name="SPSA", num_workers=1, lie_strategy="mean")
+        trial = algo.suggest(1)[0]
+        backward.algo_observe(algo, [trial], [dict(objective=1)])
+
+        trials = algo.suggest(8)
+        assert len(trials) == 8
+        assert algo.algorithm.algo.num_tell == 1 + 7
+        assert len(algo.algorithm._lied) == 7
+
+    def test_lie_not_asked_unsupported(self, mocker):
+        """Test that lies are replaced for optimizers that cannot be told points not asked"""
+        algo = self.create_algo(model_name="SPSA", num_workers=1, lie_strategy="mean")
+        nevergrad = algo.algorithm.algo
+        mocker.patch.object(
+            nevergrad,
+            "_internal_tell_not_asked",
+            side_effect=ng.errors.TellNotAskedNotSupportedError,
+        )
+        trial = algo.suggest(1)[0]
+        backward.algo_observe(algo, [trial], [dict(objective=1)])
+
+        trials = algo.suggest(4)
+        assert len(algo.algorithm._lied) == 3
+
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(4)])
+        assert not algo.algorithm._lied
+        assert nevergrad.num_tell_not_asked == 0
+        means = sorted(value.mean for value in nevergrad.archive.values())
+        assert means == [0, 1, 1, 2, 3]
+        assert len(algo.suggest(1)) == 1
+
+    def test_broken_lie(self):
+        """Test that the lies told for broken trials are forgotten"""
+        algo = self.create_algo(lie_strategy="min")
+        trials = algo.suggest(3)
+        backward.algo_observe(algo, trials[:2], [dict(objective=5), dict(objective=1)])
+        algo.suggest(1)
+        assert len(algo.algorithm.algo.archive) == 3
+
+        trials[2].status = "broken"
+        algo.observe([trials[2]])
+        optimizer = algo.algorithm.algo
+        assert len(optimizer.archive) == 2
+        codec = algo.algorithm._codec
+        best = optimizer.current_bests["pessimistic"].parameter.value
+        best = codec.decode(codec.from_values([best]))[0]
+        assert best == pytest.approx(trials[1].params, abs=1e-3)
+
+    def test_invalid_lie_strategy(self):
+        """Test that invalid lie strategies are rejected"""
+        with pytest.raises(ValueError, match="Invalid lie_strategy"):
+            self.create_algo(lie_strategy="median")
+
+    def test_observe_incremental(self, mocker):
+        """Test that trials already observed are not processed again"""
+        algo = self.create_algo()
+        trials = algo.suggest(3)
+        trials[0].status = "reserved"
+        algo.observe(trials[:1])
+        backward.algo_observe(algo, trials[1:], [dict(objective=1), dict(objective=2)])
+
+        spy = mocker.spy(algo.algorithm, "register")
+        algo.observe(trials)
+        assert spy.call_count == 0
+
+        backward.algo_observe(algo, trials[:1], [dict(objective=0)])
+        assert spy.call_count == 1
+        assert algo.algorithm.algo.num_tell == 3
+        assert algo.n_observed == 3
+
+    def test_counters(self):
+        """Test that is_done and suggest do not go through all the trials"""
+
+        class Registry(dict):
+            """Registry of trials that cannot be scanned"""
+
+            def values(self):
+                raise AssertionError("Registry of trials scanned")
+
+            items = values
+
+        algo = self.create_algo()
+        self.force_observe(10, algo)
+        observed = sum(
+            results is not None for _, results in algo.algorithm._trials_info.values()
+        )
+        assert algo.n_observed == observed == 10
+
+        new_algo = self.create_algo()
+        new_algo.set_state(algo.state_dict)
+        new_algo.algorithm._trials_info = Registry(new_algo.algorithm._trials_info)
+        assert new_algo.n_observed == 10
+        assert not new_algo.is_done
+        trials = new_algo.suggest(5)
+        backward.algo_observe(new_algo, trials, [dict(objective=i) for i in range(5)])
+        assert new_algo.n_observed == 15
+
+    def test_state_dict_compact(self):
+        """Test that the state of nevergrad is stored compressed with a compact rng"""
+        algo = self.create_algo()
+        self.force_observe(20, algo)
+        nevergrad = algo.algorithm.algo
+        rng_state = nevergrad.parametrization.random_state.get_state(legacy=False)
+        assert rng_state["bit_generator"] == "PCG64"
+
+        blob = algo.state_dict["algo"]
+        assert len(blob) < len(pickle.dumps(nevergrad)) / 2
+        assert pickle.loads(zlib.decompress(blob))["_algo"].num_tell == 20
+
+    def test_rng_streams(self):
+        """Test that independent random streams are spawned and stored as a few integers"""
+        config = dict(self.config, model_name=["TwoPointsDE", "PSO"])
+        algo = self.create_algo(config)
+        optimizers = algo.algorithm.algo.optimizers
+        draws = [
+            optimizer.parametrization.random_state.rand() for optimizer in optimizers
+        ]
+        assert draws[0] != draws[1]
+
+        state = algo.state_dict
+        assert len(state["_rng"]) == 4
+        assert all(isinstance(value, int) for value in state["_rng"])
+        expected = algo.algorithm._rng.random(3).tolist()
+
+        new_algo = self.create_algo(config)
+        new_algo.set_state(state)
+        assert new_algo.algorithm._rng.random(3).tolist() == expected
+
+    def test_set_state_lazy(self):
+        """Test that set_state defers deserializing nevergrad until it is needed"""
+        algo = self.create_algo()
+        trials = algo.suggest(3)
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(3)])
+        state = algo.state_dict
+
+        new_algo = self.create_algo()
+        new_algo.set_state(state)
+        assert new_algo.algorithm._algo_blob is state["algo"]
+        assert new_algo.algorithm._observed_ids is None
+
+        new_algo.observe(trials)
+        assert not new_algo.is_done
+        assert new_algo.state_dict["algo"] is state["algo"]
+        assert new_algo.state_dict["_trial_ids"] is state["_trial_ids"]
+
+        assert new_algo.suggest(1)[0].id == algo.suggest(1)[0].id
+        assert new_algo.algorithm._algo_blob is None
+
+    def test_warm_start(self, caplog):
+        """Test that trials not suggested are told to nevergrad in bulk"""
+        algo = self.create_algo()
+        trials = algo.space.sample(50, seed=2)
+        with caplog.at_level(logging.DEBUG):
+            self.observe_trials(trials, algo)
+
+        assert "Warm-started nevergrad with 50 trials" in caplog.text
+        assert algo.algorithm.algo.num_tell_not_asked == 50
+        assert len(algo.algorithm._told) == 50
+        assert algo.n_observed == 50
+
+    def test_warm_start_not_supported(self, caplog, mocker):
+        """Test that optimizers not supporting points not asked are not told the trials"""
+        algo = self.create_algo(model_name="SPSA", num_workers=1, n_initial_points=3)
+        mocker.patch.object(
+            algo.algorithm.algo,
+            "_internal_tell_not_asked",
+            side_effect=ng.errors.TellNotAskedNotSupportedError,
+        )
+        with caplog.at_level(logging.WARNING):
+            self.observe_trials(algo.space.sample(5, seed=2), algo)
+        assert "cannot be told trials it did not suggest" in caplog.text
+        assert len(algo.algorithm._told) == 5
+
+        trials = algo.suggest(3)
+        assert len(trials) == 3
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(3)])
+        assert len(algo.algorithm._told) == 8
+        assert algo.algorithm.algo.num_tell_not_asked == 0
+        assert len(algo.suggest(1)) == 1
+
+    def test_sample_fallback(self, mocker):
+        """Test that trials are sampled at random when nevergrad only proposes duplicates"""
+        algo = self.create_algo()
+        mocker.patch.object(algo.algorithm, "_ask", return_value=[])
+        sample = mocker.spy(algo.algorithm.space, "sample")
+        trials = algo.suggest(20)
+        assert len({trial.id for trial in trials}) == 20
+        assert sample.call_count == 1
+        assert all(algo.has_suggested(trial) for trial in trials)
+
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(20)])
+        assert algo.algorithm.algo.num_tell_not_asked == 20
+
+        space = self.create_space({"x": "choices(['a', 'b', 'c'])"})
+        algo = self.create_algo(space=space)
+        mocker.patch.object(algo.algorithm, "_ask", return_value=[])
+        assert len(algo.suggest(5)) == 3
+        assert algo.is_done
+
+    @pytest.mark.parametrize(
+        "prior",
+        [
+            "choices({'a': 0.2, 'b': 0.8})",
+            "choices(['a', 'b', 'c'], shape=2)",
+            "loguniform(1, 10, shape=2)",
+            "normal(0, 1, discrete=True)",
+            "gamma(2)",
+        ],
+    )
+    def test_dimensions(self, prior):
+        """Test that dimensions of any type and prior can be optimized"""
+        space = self.create_space({"x": prior, "y": "uniform(0, 1)"})
+        algo = self.create_algo(space=space)
+        trials = algo.suggest(5)
+        assert len(trials) == 5
+        assert all(trial in space for trial in trials)
+
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(5)])
+        assert algo.algorithm.algo.num_tell == 5
+        assert not algo.is_done
+        assert len(algo.suggest(5)) == 5
+
+    def test_empty_suggest(self, mocker):
+        """Test that empty batches do not end the experiment unless the space is exhausted"""
+        algo = self.create_algo()
+        assert algo.suggest(0) == []
+        assert not algo.is_done
+        assert len(algo.suggest(3)) == 3
+
+        algo = self.create_algo(constraints=["(x < 0.2) & (y < 0.5)"])
+        mocker.patch.object(algo.algorithm, "_ask", return_value=[])
+        mocker.patch.object(algo.algorithm.space, "sample", return_value=[])
+        assert algo.suggest(1) == []
+        assert not algo.is_done
+        assert not algo.algorithm.state_dict["_is_done"]
+
+    def test_oversampling(self):
+        """Test that a diverse subset of the candidates asked is suggested"""
+        algo = self.create_algo(oversampling=4)
+        trials = algo.suggest(8)
+        assert len(trials) == 8
+        assert algo.algorithm.algo.num_ask == 32
+        assert len(algo.algorithm._pending) == 8
+
+    @pytest.mark.parametrize(
+        "argument",
+        [
+            dict(oversampling=0),
+            dict(tell_batch_size=0),
+            dict(repeats=0),
+            dict(prefetch=-1),
+        ],
+    )
+    def test_invalid_counts(self, argument):
+        """Test that counts of candidates or evaluations out of their range are rejected"""
+        with pytest.raises(ValueError, match="must be at least"):
+            self.create_algo(**argument)
+
+    def test_constraints(self, mocker):
+        """Test that trials violating the constraints are not suggested"""
+        algo = self.create_algo(constraints=["x + y <= 1", _x_above_tenth])
+        trials = algo.suggest(30)
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(30)])
+        trials += algo.suggest(30)
+        assert len(trials) == 60
+        assert all(t.params["x"] + t.params["y"] <= 1 for t in trials)
+        assert all(t.params["x"] >= 0.1 for t in trials)
+
+        new_algo = self.create_algo(constraints=["x + y <= 1", _x_above_tenth])
+        new_algo.set_state(algo.state_dict)
+        mocker.patch.object(new_algo.algorithm, "_ask", return_value=[])
+        trials = new_algo.suggest(30)
+        assert trials
+        assert all(t.params["x"] + t.params["y"] <= 1 for t in trials)
+
+        with pytest.raises(ValueError, match="cannot be pickled"):
+            self.create_algo(constraints=[lambda params: params["x"] > 0.5])
+
+    def test_repeats(self):
+        """Test that promising candidates are evaluated again and told their mean objective"""
+        space = self.create_space(
+            self.update_space({"seed": "uniform(0, 10, discrete=True)"})
+        )
+        algo = self.create_algo(space=space, repeats=3, seed_dimension="seed")
+        trials = algo.suggest(4)
+        assert [trial.params["seed"] for trial in trials] == [0] * 4
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(4)])
+        assert not algo.algorithm._told
+
+        # Nothing was evaluated before, so all the candidates are evaluated again
+        repeated = algo.suggest(4)
+        assert [trial.params["seed"] for trial in repeated] == [1] * 4
+        assert [dict(t.params, seed=0) for t in repeated] == [t.params for t in trials]
+        backward.algo_observe(algo, repeated, [dict(objective=i + 2) for i in range(4)])
+        assert sorted(algo.algorithm._told.values()) == [2, 3, 4]
+        evaluations = algo.algorithm._evaluations
+        assert evaluations.variance(algo.algorithm._reevaluations[0]) == 2
+
+        new_algo = self.create_algo(space=space, repeats=3, seed_dimension="seed")
+        new_algo.set_state(algo.state_dict)
+        trials = new_algo.suggest(4)
+        assert len(trials) == 4
+        assert trials[0].params == dict(repeated[0].params, seed=2)
+
+        with pytest.raises(ValueError, match="seed_dimension"):
+            self.create_algo(repeats=2)
+        with pytest.raises(ValueError, match="less than 20 values"):
+            self.create_algo(space=space, repeats=20, seed_dimension="seed")
+        with pytest.raises(ValueError, match="integer or categorical"):
+            self.create_algo(space=space, repeats=3, seed_dimension="x")
+
+    def test_enumeration(self, mocker):
+        """Test that small discrete spaces are enumerated once nevergrad only proposes duplicates"""
+        space = self.create_space(
+            {"x": "uniform(0, 5, discrete=True)", "y": "choices(['a', 'b', 'c'])"}
+        )
+        algo = self.create_algo(space=space)
+        assert algo.algorithm._grid_size == 18
+        mocker.patch.object(algo.algorithm, "_ask", return_value=[])
+        trials = algo.suggest(7)
+        state = algo.state_dict
+        assert state["_grid"][2] == 7
+        trials += algo.suggest(7)
+
+        new_algo = self.create_algo(space=space)
+        new_algo.set_state(state)
+        mocker.patch.object(new_algo.algorithm, "_ask", return_value=[])
+        assert [trial.id for trial in new_algo.suggest(7)] == [
+            trial.id for trial in trials[7:]
+        ]
+
+        trials += algo.suggest(7)
+        assert len({(trial.params["x"], trial.params["y"]) for trial in trials}) == 18
+        assert algo.is_done
+
+    def test_enumeration_exhaustion(self):
+        """Test that nevergrad is not asked again once most of a grid was suggested"""
+        space = self.create_space(
+            {"x": "uniform(0, 19, discrete=True)", "y": "uniform(0, 19, discrete=True)"}
+        )
+        algo = self.create_algo(space=space)
+        algo.algorithm.max_trials = 400
+        trials = []
+        for _ in range(100):
+            new_trials = algo.suggest(4)
+            backward.algo_observe(
+                algo, new_trials, [dict(objective=i) for i in range(len(new_trials))]
+            )
+            trials += new_trials
+        assert len({(trial.params["x"], trial.params["y"]) for trial in trials}) == 400
+        assert algo.algorithm.algo.num_ask < 800
+        assert algo.suggest(1) == []
+
+    @pytest.mark.parametrize("initial_design", ["LHSSearch", "ScrHammersleySearch"])
+    def test_initial_design(self, initial_design):
+        """Test that the initial design is suggested first and told as not asked"""
+        algo = self.create_algo(n_initial_points=8, initial_design=initial_design)
+        trials = algo.suggest(5)
+        assert len(trials) == 5
+        assert algo.algorithm.algo.num_ask == 0
+        trials += algo.suggest(5)
+        assert len(trials) == 10
+        assert algo.algorithm.algo.num_ask == 2
+
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(10)])
+        assert algo.algorithm.algo.num_tell_not_asked == 8
+        assert algo.algorithm.algo.num_tell == 10
+
+        with pytest.raises(ValueError, match="Unknown nevergrad optimizer"):
+            self.create_algo(n_initial_points=8, initial_design="Sobol")
+
+    def test_prefetch(self):
+        """Test that suggest returns candidates prefetched at the end of observe"""
+        algo = self.create_algo(prefetch=20)
+        trials = algo.suggest(10)
+        backward.algo_observe(algo, trials[:5], [dict(objective=i) for i in range(5)])
+        prefetched = algo.algorithm._prefetched
+        assert len(prefetched) == 20
+
+        num_ask = algo.algorithm.algo.num_ask
+        state = algo.state_dict
+        ids = [trial.id for trial, _, _, _ in prefetched.values()]
+        suggested = algo.suggest(8)
+        assert [trial.id for trial in suggested] == ids[:8]
+        assert all(algo.has_suggested(trial) for trial in suggested)
+        assert algo.algorithm.algo.num_ask == num_ask
+
+        new_algo = self.create_algo(prefetch=20)
+        new_algo.set_state(state)
+        assert [trial.id for trial in new_algo.suggest(8)] == ids[:8]
+
+        # Candidates are stale once a generation of results was told since they were asked.
+        backward.algo_observe(algo, trials[5:], [dict(objective=i) for i in range(5)])
+        assert len(prefetched) == 20
+        backward.algo_observe(
+            algo, algo.suggest(10), [dict(objective=i) for i in range(10)]
+        )
+        assert len(prefetched) == 20
+        assert not set(ids) & {trial.id for trial, _, _, _ in prefetched.values()}
+
+    def test_prefetch_oversampling(self, mocker):
+        """Test that prefetched trials are selected with the surrogate like asked candidates"""
+        algo = self.create_algo(prefetch=5, oversampling=4, surrogate="knn")
+        trials = algo.suggest(20)
+        backward.algo_observe(
+            algo, trials, [dict(objective=trial.params["x"]) for trial in trials]
+        )
+        prefetched = algo.algorithm._prefetched
+        assert len(prefetched) == 20
+
+        algo.algorithm._surrogate.fit(60)
+        candidates = [trial for trial, _, _, _ in prefetched.values()]
+        predictions = algo.algorithm._surrogate.predict(
+            algo.algorithm._codec.encode([trial.params for trial in candidates])
+        )
+        best = numpy.argsort(predictions, kind="stable")[:5]
+        ask = mocker.spy(algo.algorithm.algo, "ask")
+        trials = algo.suggest(5)
+        assert ask.call_count == 0
+        assert {trial.id for trial in trials} == {candidates[i].id for i in best}
+        assert not prefetched
+
+    def test_tell_buffer(self, monkeypatch):
+        """Test that objectives are told to nevergrad in batches or after some time"""
+        algo = self.create_algo(tell_batch_size=5, tell_interval=60)
+        trials = algo.suggest(10)
+        backward.algo_observe(algo, trials[:4], [dict(objective=i) for i in range(4)])
+        assert algo.algorithm.algo.num_tell == 0
+        assert algo.n_observed == 4
+        backward.algo_observe(algo, trials[4:5], [dict(objective=4)])
+        assert algo.algorithm.algo.num_tell == 5
+
+        backward.algo_observe(algo, trials[5:6], [dict(objective=5)])
+        assert algo.algorithm.algo.num_tell == 5
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 60)
+        backward.algo_observe(algo, trials[6:7], [dict(objective=6)])
+        assert algo.algorithm.algo.num_tell == 7
+
+    @pytest.mark.parametrize(
+        "model_name",
+        [
+            "CMA",
+            {"Chaining": {"optimizers": ["LHSSearch", "TwoPointsDE"], "budgets": [10]}},
+            {"Portfolio": {"optimizers": ["CMA", "PSO"]}},
+        ],
+    )
+    def test_model_name(self, model_name):
+        """Test that optimizers are resolved from nevergrad's registry and families"""
+        algo = self.create_algo(model_name=model_name, budget=30)
+        self.force_observe(15, algo)
+        assert algo.algorithm.algo.num_tell == 15
+        assert algo.algorithm.algo.budget == 30
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_portfolio(self, n_jobs):
+        """Test that a portfolio runs its optimizers in worker processes and restores its state"""
+        config = dict(
+            self.config, model_name=["TwoPointsDE", "CMA", "PSO"], n_jobs=n_jobs
+        )
+        algo = self.create_algo(config)
+        self.force_observe(30, algo)
+        portfolio = algo.algorithm.algo
+        assert isinstance(portfolio, OptimizerPortfolio)
+        assert set(portfolio._owners.values()) == {0, 1, 2}
+
+        state = algo.state_dict
+        trials = algo.suggest(6)
+        new_algo = self.create_algo(config)
+        new_algo.set_state(state)
+        assert [trial.id for trial in new_algo.suggest(6)] == [
+            trial.id for trial in trials
+        ]
+
+    def test_tell_observed(self):
+        """Test that observed trials are told to nevergrad, suggested or not"""
+        algo = self.create_algo()
+        trials = algo.suggest(3)
+        assert algo.algorithm.algo.num_ask == 3
+
+        backward.algo_observe(algo, trials, [dict(objective=i) for i in range(3)])
+        assert algo.algorithm.algo.num_tell == 3
+        assert algo.algorithm.algo.num_tell_not_asked == 0
+
+        trial = algo.space.sample(1, seed=1)[0]
+        backward.algo_observe(algo, [trial], [dict(objective=3)])
+        assert algo.algorithm.algo.num_tell == 4
+        assert algo.algorithm.algo.num_tell_not_asked == 1
+
+        # Observing again the same trials does not tell them twice
+        backward.algo_observe(algo, trials[:1], [dict(objective=0)])
+        assert algo.algorithm.algo.num_tell == 4
+
+    @pytest.mark.filterwarnings("ignore::nevergrad.common.errors.BadLossWarning")
+    def test_broken_trials(self):
+        """Test that broken trials are told a penalty so that sequential optimizers go on"""
+        algo = self.create_algo(model_name="SPSA", num_workers=1)
+        trial = algo.suggest(1)[0]
+        trial.status = "broken"
+        algo.observe([trial])
+        assert not algo.algorithm._pending
+        assert algo.algorithm.algo.num_tell == 1
+
+        trial = algo.suggest(1)[0]
+        backward.algo_observe(algo, [trial], [dict(objective=2)])
+        trial = algo.suggest(1)[0]
+        trial.status = "broken"
+        algo.observe([trial])
+        assert algo.algorithm.algo.num_tell == 3
+        assert sorted(algo.algorithm._told.values()) == [2, 2, numpy.inf]
+        assert len(algo.suggest(1)) == 1
+
+
+def test_resolve_optimizer():
+    """Test that optimizer configurations are validated and cached"""
+    assert resolve_optimizer("NGOpt") is ng.optimizers.NGOpt
+
+    chaining = {"Chaining": {"optimizers": ["LHSSearch", "CMA"], "budgets": [10]}}
+    optimizer = resolve_optimizer(chaining)
+    assert isinstance(optimizer, ng.families.Chaining)
+    assert resolve_optimizer(dict(chaining)) is optimizer
+
+    with pytest.raises(ValueError, match="Unknown nevergrad optimizer"):
+        resolve_optimizer("DoesNotExist")
+    with pytest.raises(ValueError, match="Unknown nevergrad family"):
+        resolve_optimizer({"DoesNotExist": {}})
+    with pytest.raises(ValueError, match="Invalid nevergrad optimizer"):
+        resolve_optimizer({"CMA": {}, "PSO": {}})
 
 
 # You may add other phases for test.
 # See https://github.com/Epistimio/orion.algo.skopt/blob/master/tests/integration_test.py
 # for an example where two phases are registered, one for the initial random step, and
 # another for the optimization step with a Gaussian Process.
-TestNevergradOptimizer.set_phases([("random", 0, "space.sample")])
+TestNevergradOptimizer.set_phases([("default", 0, "_ask")])
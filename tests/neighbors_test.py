@@ -0,0 +1,129 @@
+"""Perform tests for `orion.algo.nevergrad.neighbors`."""
+# pylint: disable=protected-access
+import pickle
+
+import numpy
+import pytest
+from orion.core.utils import backward
+
+from orion.algo.nevergrad import neighbors
+from orion.algo.nevergrad.neighbors import KNNSurrogate, NeighborIndex, select_diverse
+
+
+@pytest.mark.parametrize("tree", [True, False])
+def test_neighbor_index(monkeypatch, tree):
+    """Test nearest neighbor queries, with a KD-tree or by brute force"""
+    if not tree:
+        monkeypatch.setattr(neighbors, "cKDTree", None)
+    monkeypatch.setattr(neighbors, "NEIGHBOR_REBUILD_SIZE", 16)
+    rng = numpy.random.default_rng(1)
+    lower = numpy.array([0.0, -numpy.inf])
+    upper = numpy.array([10.0, numpy.inf])
+    # Empty indices are pickled without capacity
+    index = pickle.loads(pickle.dumps(NeighborIndex(lower, upper)))
+    points = rng.uniform(0, 10, size=(100, 2))
+    index.add(points, list(range(100)))
+    index.add(points[:5], list(range(5)))
+    assert len(index) == 100
+
+    queries = rng.uniform(0, 10, size=(20, 2))
+    normalized = lambda data: data / [10.0, 1.0]
+    expected = numpy.sqrt(
+        ((normalized(queries)[:, None] - normalized(points)[None]) ** 2).sum(axis=-1)
+    )
+    distances, keys = index.nearest(queries)
+    numpy.testing.assert_allclose(distances, expected.min(axis=1))
+    assert keys == expected.argmin(axis=1).tolist()
+
+    distances, keys = pickle.loads(pickle.dumps(index)).nearest(queries)
+    numpy.testing.assert_allclose(distances, expected.min(axis=1))
+
+    distances, indices = index.neighbors(queries, 3)
+    numpy.testing.assert_allclose(distances, numpy.sort(expected, axis=1)[:, :3])
+    assert indices.tolist() == numpy.argsort(expected, axis=1)[:, :3].tolist()
+
+
+def test_knn_surrogate():
+    """Test that the k-NN surrogate is fit incrementally within a time limit"""
+    rng = numpy.random.default_rng(1)
+    surrogate = KNNSurrogate(numpy.zeros(2), numpy.ones(2))
+    points = rng.uniform(size=(1000, 2))
+    surrogate.add(points, list(range(1000)), points.sum(axis=1))
+    surrogate.fit(0)
+    assert len(surrogate.index) == 0
+    surrogate.fit(10)
+    assert len(surrogate.index) == 1000
+
+    numpy.testing.assert_allclose(
+        surrogate.predict(points[:10]), points[:10].sum(axis=1)
+    )
+    queries = rng.uniform(0.2, 0.8, size=(100, 2))
+    errors = surrogate.predict(queries) - queries.sum(axis=1)
+    assert numpy.abs(errors).max() < 0.1
+
+
+def test_select_diverse():
+    """Test that points are selected greedily by max-min distance"""
+    points = numpy.array([[0.0, 0.0], [0.1, 0.0], [1.0, 1.0], [0.0, 1.0], [0.8, 1.0]])
+    assert select_diverse(points, 3) == [0, 2, 3]
+    assert select_diverse(points, 10) == [0, 2, 3, 4, 1]
+
+
+def test_epsilon(algo_tests):
+    """Test that candidates close to trials already suggested are rejected"""
+    algo = algo_tests.create_algo(epsilon=0.05)
+    algo_tests.force_observe(30, algo)
+    trials = algo.suggest(10)
+
+    points = numpy.array(
+        [
+            [trial.params["x"], trial.params["y"]]
+            for trial, _ in algo.algorithm._trials_info.values()
+        ]
+    )
+    distances = numpy.sqrt(((points[:, None] - points[None]) ** 2).sum(axis=-1))
+    numpy.fill_diagonal(distances, numpy.inf)
+    assert distances.min() >= 0.05
+    assert len(trials) == 10
+
+
+def test_surrogate(algo_tests, mocker):
+    """Test that the candidates with the best predicted objectives are suggested"""
+    algo = algo_tests.create_algo(oversampling=4, surrogate="knn")
+    trials = algo.suggest(20)
+    backward.algo_observe(
+        algo, trials, [dict(objective=trial.params["x"]) for trial in trials]
+    )
+    surrogate = algo.algorithm._surrogate
+    assert len(surrogate.index) == 0
+
+    ask_candidates = mocker.spy(algo.algorithm, "_ask_candidates")
+    trials = algo.suggest(5)
+    assert len(surrogate.index) == 20
+    candidates = ask_candidates.spy_return
+    assert len(candidates) == 20
+    predictions = surrogate.predict(
+        algo.algorithm._codec.encode([trial.params for _, trial, _ in candidates])
+    )
+    best = numpy.argsort(predictions)[:5]
+    assert {trial.id for trial in trials} == {candidates[i][1].id for i in best}
+
+
+def test_surrogate_set_state(algo_tests):
+    """Test that the surrogate is fit after a state round trip, like in Oríon's cycles"""
+    algo = algo_tests.create_algo(oversampling=4, surrogate="knn")
+    trials = algo.suggest(5)
+    backward.algo_observe(algo, trials, [dict(objective=i) for i in range(5)])
+
+    new_algo = algo_tests.create_algo(oversampling=4, surrogate="knn")
+    new_algo.set_state(algo.state_dict)
+    assert len(new_algo.suggest(5)) == 5
+    assert len(new_algo.algorithm._surrogate.index) == 5
+
+
+def test_invalid_surrogate(algo_tests):
+    """Test that invalid surrogates are rejected"""
+    with pytest.raises(ValueError, match="Invalid surrogate"):
+        algo_tests.create_algo(surrogate="gp")
+    with pytest.raises(ValueError, match="oversampling"):
+        algo_tests.create_algo(surrogate="knn")
@@ -0,0 +1,117 @@
+"""Perform tests for `orion.algo.nevergrad.objectives`."""
+# pylint: disable=protected-access
+import numpy
+import pytest
+from orion.core.utils import backward
+from orion.core.worker.trial import Trial
+
+from orion.algo.nevergrad.objectives import (
+    ObjectiveSummary,
+    ParetoFront,
+    RunningStats,
+)
+
+
+@pytest.mark.parametrize("num_objectives", [2, 3])
+def test_pareto_front(num_objectives):
+    """Test that the incremental Pareto front matches the one computed from scratch"""
+    rng = numpy.random.default_rng(1)
+    points = rng.integers(0, 20, size=(500, num_objectives)).astype(float)
+    front = ParetoFront()
+    for index, point in enumerate(points):
+        front.add(point, index)
+
+    expected = [
+        index
+        for index, point in enumerate(points)
+        if not (points[:index] == point).all(axis=1).any()
+        and not ((points <= point).all(axis=1) & (points < point).any(axis=1)).any()
+    ]
+    assert sorted(front.items) == expected
+    assert front.objectives == sorted(front.objectives)
+    assert not front.add(points[expected[0]], -1)
+
+
+@pytest.mark.parametrize("num_objectives", [1, 2])
+def test_running_stats(num_objectives):
+    """Test that running statistics match the ones computed from all the evaluations"""
+    rng = numpy.random.default_rng(1)
+    keys = rng.integers(0, 40, size=500)
+    values = rng.normal(size=(500, num_objectives)).squeeze()
+    stats = RunningStats(num_objectives)
+    for key, value in zip(keys, values):
+        stats.add(key, value)
+
+    assert len(stats) == 40
+    for key in range(40):
+        evaluations = values[keys == key]
+        assert stats.count(key) == len(evaluations)
+        numpy.testing.assert_allclose(stats.mean(key), evaluations.mean(axis=0))
+        numpy.testing.assert_allclose(
+            stats.variance(key), evaluations.var(axis=0, ddof=1)
+        )
+
+
+@pytest.mark.parametrize("num_objectives", [1, 2])
+def test_objective_summary(num_objectives):
+    """Test that the summary matches the finite objectives added"""
+    rng = numpy.random.default_rng(1)
+    values = rng.normal(size=(100, num_objectives)).squeeze()
+    summary = ObjectiveSummary(num_objectives)
+    for value in values:
+        summary.add(value)
+    summary.add(numpy.full(num_objectives, numpy.inf).squeeze())
+
+    assert len(summary) == 100
+    numpy.testing.assert_allclose(summary.mean(), values.mean(axis=0))
+    numpy.testing.assert_allclose(summary.min(), values.min(axis=0))
+    numpy.testing.assert_allclose(summary.max(), values.max(axis=0))
+    assert isinstance(summary.max(), float) == (num_objectives == 1)
+
+
+def test_objectives(algo_tests):
+    """Test that several objectives are told to nevergrad and kept in a Pareto front"""
+    algo = algo_tests.create_algo(objectives=["objective", "latency"])
+    trials = algo.suggest(10)
+    for i, trial in enumerate(trials):
+        trial.results.append(
+            Trial.Result(name="latency", type="statistic", value=(i - 5) ** 2)
+        )
+    backward.algo_observe(algo, trials, [dict(objective=i) for i in range(10)])
+    assert algo.algorithm.algo.num_objectives == 2
+    assert len(algo.algorithm._told) == 10
+    front = algo.algorithm.pareto_front
+    assert [trial.params for trial in front] == [t.params for t in trials[:6]]
+
+    new_algo = algo_tests.create_algo(objectives=["objective", "latency"])
+    new_algo.set_state(algo.state_dict)
+    assert len(new_algo.algorithm.pareto_front) == 6
+    assert algo_tests.create_algo().algorithm.pareto_front == []
+
+    with pytest.raises(ValueError, match="several objectives"):
+        algo_tests.create_algo(objectives=["objective", "latency"], lie_strategy="mean")
+
+
+def test_objectives_repeats(algo_tests):
+    """Test that only the means of repeated evaluations are kept in the Pareto front"""
+    space = algo_tests.create_space(
+        algo_tests.update_space({"seed": "uniform(0, 10, discrete=True)"})
+    )
+    algo = algo_tests.create_algo(
+        space=space,
+        objectives=["objective", "latency"],
+        repeats=2,
+        seed_dimension="seed",
+    )
+    trials = algo.suggest(4)
+    for trial in trials:
+        trial.results.append(Trial.Result(name="latency", type="statistic", value=0))
+    backward.algo_observe(algo, trials, [dict(objective=i) for i in range(4)])
+    assert algo.algorithm.pareto_front == []
+
+    repeated = algo.suggest(4)
+    for i, trial in enumerate(repeated):
+        trial.results.append(Trial.Result(name="latency", type="statistic", value=i))
+    backward.algo_observe(algo, repeated, [dict(objective=10 - i) for i in range(4)])
+    front = algo.algorithm.pareto_front
+    assert [trial.params for trial in front] == [repeated[0].params]
@@ -0,0 +1,78 @@
+"""Perform tests for `orion.algo.nevergrad.portfolio`."""
+# pylint: disable=protected-access
+import logging
+
+import nevergrad as ng
+import pytest
+
+from orion.algo.nevergrad import portfolio as portfolio_module
+from orion.algo.nevergrad.portfolio import OptimizerPortfolio
+
+
+def test_portfolio_allocation():
+    """Test that candidates move to the optimizers of a portfolio with recent improvements"""
+    portfolio = OptimizerPortfolio(
+        [
+            ng.optimizers.registry[name](parametrization=2, budget=100, num_workers=10)
+            for name in ("TwoPointsDE", "PSO")
+        ]
+    )
+    assert portfolio.allocate(10).tolist() == [5, 5]
+
+    candidates = portfolio.ask_batch(10)
+    for objective, candidate in enumerate(candidates):
+        owner = portfolio._owners[candidate.uid]
+        portfolio.tell(candidate, objective if owner == 0 else -objective)
+    counts = portfolio.allocate(10)
+    assert counts.sum() == 10
+    assert counts[1] > counts[0] > 0
+
+
+def test_portfolio_processes(caplog):
+    """Test that steps run in worker processes are measured and the pools shut down"""
+    portfolio = OptimizerPortfolio(
+        [
+            ng.optimizers.registry[name](parametrization=2, budget=100, num_workers=10)
+            for name in ("TwoPointsDE", "PSO")
+        ],
+        n_jobs=2,
+    )
+    portfolio.enable_pickling()
+    with caplog.at_level(logging.DEBUG):
+        candidates = portfolio.ask_batch(4)
+    assert len(candidates) == 4
+    assert "Ran 2 steps of the portfolio" in caplog.text
+
+    executor = portfolio_module._executors[2]
+    portfolio_module._shutdown_executors()
+    assert not portfolio_module._executors
+    with pytest.raises(RuntimeError):
+        executor.submit(len, [])
+
+
+def test_portfolio_owners():
+    """Test that the owners of candidates are released once their objective is applied"""
+    portfolio = OptimizerPortfolio(
+        [
+            ng.optimizers.registry[name](parametrization=2, budget=100, num_workers=10)
+            for name in ("TwoPointsDE", "PSO")
+        ]
+    )
+    candidates = portfolio.ask_batch(6)
+    lied, told, dropped = candidates[:2], candidates[2:4], candidates[4:]
+    for candidate in lied:
+        portfolio.tell_lie(candidate, 1.0)
+    for candidate in told:
+        portfolio.tell(candidate, 0.0)
+    portfolio.forget(dropped)
+    assert len(portfolio._owners) == 4
+
+    new_candidates = portfolio.ask_batch(10)
+    assert set(portfolio._owners) == {
+        candidate.uid for candidate in lied + new_candidates
+    }
+
+    for candidate in lied:
+        portfolio.replace_lie(candidate, 0.5)
+    portfolio.ask_batch(10)
+    assert not any(candidate.uid in portfolio._owners for candidate in lied)